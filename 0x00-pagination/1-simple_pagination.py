@@ -1,31 +1,55 @@
 #!/usr/bin/env python3
 """Script designed to handle pagination for a dataset"""
 
-import csv
 import math
-from typing import List
+from typing import Iterable, List, Optional
 from typing import Tuple
 
+from datasets import RowView, load_dataset
+from response_cache import ResponseCache, cached_response
+
 
 class Server:
     """Server class to paginate a database of popular baby names.
     """
     DATA_FILE = "Popular_Baby_Names.csv"
 
-    def __init__(self):
+    def __init__(self, backend: str = "rows",
+                 response_cache: Optional[ResponseCache] = None,
+                 reload_interval: Optional[float] = None):
+        """
+        Initialize the server.
+
+        Args:
+            backend (str): How the dataset is stored once loaded, see
+                `datasets.load_dataset`. Defaults to a list of rows.
+            response_cache (ResponseCache): Cache of the page responses.
+                Defaults to None, no caching.
+            reload_interval (float): If given, the data file is checked
+                for changes at most every `reload_interval` seconds and
+                reloaded, see `datasets.LiveDataset`. Defaults to None,
+                loading it once.
+        """
+        self.backend = backend
+        self.response_cache = response_cache
+        self.reload_interval = reload_interval
         self.__dataset = None
 
     def dataset(self) -> List[List]:
         """Cached dataset
         """
         if self.__dataset is None:
-            with open(self.DATA_FILE) as f:
-                reader = csv.reader(f)
-                dataset = [row for row in reader]
-            self.__dataset = dataset[1:]
+            self.__dataset = load_dataset(self.DATA_FILE, self.backend,
+                                          self.reload_interval)
 
         return self.__dataset
 
+    def dataset_version(self) -> int:
+        """Number of reloads of the dataset, 0 if it is never reloaded
+        """
+        return getattr(self.dataset(), "version", 0)
+
+    @cached_response
     def get_page(self, page: int = 1, page_size: int = 10) -> List[List]:
         """
         Retrieve a page of data from the dataset
@@ -49,6 +73,53 @@ class Server:
         data = self.dataset()
         return data[my_range[0]: my_range[1]]
 
+    def get_range(self, start: int, stop: int) -> RowView:
+        """
+        Retrieve the rows from `start` to `stop` without copying them.
+
+        Args:
+            start (int): The index of the first row (0-based).
+            stop (int): The index after the last row, clamped to the
+                size of the dataset.
+
+        Returns:
+            RowView: A read-only view of the rows, see `datasets.RowView`.
+
+        Raises:
+            AssertionError: If `start` or `stop` is not a non-negative
+                            integer.
+        """
+        assert isinstance(start, int) and start >= 0
+        assert isinstance(stop, int) and stop >= 0
+        return RowView(self.dataset(), start, stop)
+
+    def get_pages(self, pages: Iterable[int],
+                  page_size: int = 10) -> List[RowView]:
+        """
+        Retrieve several pages at once without copying their rows.
+
+        Every page is a view of the same state of the dataset, so pages
+        of a reloading dataset are consistent with each other.
+
+        Args:
+            pages (Iterable[int]): page numbers to retrieve (1-based index).
+            page_size (int): number of items per page. Defaults to 10.
+
+        Returns:
+            List[RowView]: A read-only view of the rows of each page, in
+                           the order of `pages`.
+
+        Raises:
+            AssertionError: If a page or `page_size` is not a positive
+                            integer.
+        """
+        pages = list(pages)
+        assert all(isinstance(page, int) and page > 0 for page in pages)
+        assert isinstance(page_size, int) and page_size > 0
+        rows = RowView(self.dataset())
+        return [rows[start:end]
+                for start, end in index_ranges(pages, page_size)]
+
 
 def index_range(page: int, page_size: int) -> Tuple[int, int]:
     """
@@ -66,3 +137,20 @@ def index_range(page: int, page_size: int) -> Tuple[int, int]:
 
     offset = (page - 1) * page_size
     return offset, offset + page_size
+
+
+def index_ranges(pages: Iterable[int],
+                 page_size: int) -> List[Tuple[int, int]]:
+    """
+        Calculate the start and end index of several pages at once,
+        like `index_range` does for one.
+
+        Args:
+            pages (Iterable[int]): The page numbers (1-based index).
+            page_size (int): The number of items per page.
+
+        Returns:
+            List[Tuple[int, int]]: The start and end index of each page.
+    """
+
+    return [((page - 1) * page_size, page * page_size) for page in pages]
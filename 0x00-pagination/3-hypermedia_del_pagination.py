@@ -3,9 +3,12 @@
 Deletion-resilient hypermedia pagination
 """
 
-import csv
 import math
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+from datasets import IndexedDataset, load_dataset
+from prefetch import Prefetcher, follow_index, prefetched
+from response_cache import ResponseCache, cached_response
 
 
 class Server:
@@ -13,7 +16,29 @@ class Server:
     """
     DATA_FILE = "Popular_Baby_Names.csv"
 
-    def __init__(self):
+    def __init__(self, backend: str = "rows",
+                 response_cache: Optional[ResponseCache] = None,
+                 reload_interval: Optional[float] = None,
+                 prefetcher: Optional[Prefetcher] = None):
+        """
+        Initialize the server.
+
+        Args:
+            backend (str): How the dataset is stored once loaded, see
+                `datasets.load_dataset`. Defaults to a list of rows.
+            response_cache (ResponseCache): Cache of the page responses.
+                Defaults to None, no caching.
+            reload_interval (float): If given, the data file is checked
+                for changes at most every `reload_interval` seconds and
+                reloaded, see `datasets.LiveDataset`. Defaults to None,
+                loading it once.
+            prefetcher (Prefetcher): Reads the next pages of sequential
+                readers ahead. Defaults to None, no read-ahead.
+        """
+        self.backend = backend
+        self.response_cache = response_cache
+        self.reload_interval = reload_interval
+        self.prefetcher = prefetcher
         self.__dataset = None
         self.__indexed_dataset = None
 
@@ -21,58 +46,65 @@ class Server:
         """Cached dataset
         """
         if self.__dataset is None:
-            with open(self.DATA_FILE) as f:
-                reader = csv.reader(f)
-                dataset = [row for row in reader]
-            self.__dataset = dataset[1:]
+            self.__dataset = load_dataset(self.DATA_FILE, self.backend,
+                                          self.reload_interval)
 
         return self.__dataset
 
-    def indexed_dataset(self) -> Dict[int, List]:
+    def indexed_dataset(self) -> IndexedDataset:
         """Dataset indexed by sorting position, starting at 0
         """
         if self.__indexed_dataset is None:
-            dataset = self.dataset()
-            truncated_dataset = dataset[:1000]
-            self.__indexed_dataset = {
-                i: dataset[i] for i in range(len(dataset))
-            }
+            self.__indexed_dataset = IndexedDataset(self.dataset())
+        else:
+            self.__indexed_dataset.sync()
         return self.__indexed_dataset
 
+    def dataset_version(self) -> Tuple[int, int]:
+        """Number of reloads of the dataset, and of changes made to the
+        indexed dataset
+        """
+        reloads = getattr(self.dataset(), "version", 0)
+        if self.__indexed_dataset is None:
+            return reloads, 0
+        return reloads, self.__indexed_dataset.version
+
+    @prefetched(follow_index)
+    @cached_response
     def get_hyper_index(self, index: int = None, page_size: int = 10) -> Dict:
         """
         Retrieve a paginated dataset starting from a specified index
         and return additional pagination metadata.
 
+        Rows deleted from `indexed_dataset()` are skipped, so consecutive
+        pages neither repeat nor miss a row. Finding the page costs
+        O(log n + page_size) whatever the number of deleted rows.
+
         Args:
             index (int): starting index for the current page in the dataset.
-                        Defaults to None.
+                        Defaults to None, the first row.
             page_size (int): The number of items per page. Defaults to 10.
 
         Returns:
             Dict: A dictionary containing:
                 - index (int): The starting index of the current page.
-                - next_index (int): The starting index for the next page.
+                - next_index (Optional[int]): The starting index for the
+                            next page, or None if there is no next page.
                 - page_size (int): The number of items on the current page.
                 - data (List): A list of dataset items for the current page.
         """
-        indexed_dataset = self.__indexed_dataset
-        assert index >= 0 and index < len(indexed_dataset) - 1
-        assert page_size > 0
-
-        data = []
-        stop_index = index + page_size
-        next_index = index
-        i = index
-
-        while i < stop_index:
-            row = indexed_dataset.get(i)
-            if row:
-                data.append(row)
-            else:
-                stop_index += 1
-            next_index += 1
-            i += 1
+        indexed_dataset = self.indexed_dataset()
+        if index is None:
+            index = 0
+        assert isinstance(index, int)
+        assert index >= 0 and index < indexed_dataset.stop
+        assert isinstance(page_size, int) and page_size > 0
+
+        positions = indexed_dataset.next_live(index, page_size + 1)
+        data = [indexed_dataset[i] for i in positions[:page_size]]
+        next_index = None
+        if len(positions) > page_size:
+            next_index = positions[page_size - 1] + 1
 
         return {
             "index": index,
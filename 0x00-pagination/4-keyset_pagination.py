@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Keyset (cursor) pagination with sorting and filtering
+"""
+
+from typing import Any, Dict, Optional
+
+from keyset import KeysetIndex, decode_cursor, encode_cursor
+from prefetch import Prefetcher
+from response_cache import ResponseCache, cached_response
+
+HyperServer = __import__('2-hypermedia_pagination').Server
+
+
+class Server(HyperServer):
+    """Server class to paginate a database of popular baby names,
+    by cursor, in any order and with filters.
+    """
+    def __init__(self, backend: str = "rows",
+                 response_cache: Optional[ResponseCache] = None,
+                 reload_interval: Optional[float] = None,
+                 prefetcher: Optional[Prefetcher] = None):
+        """
+        Initialize the server.
+
+        Args:
+            backend (str): How the dataset is stored once loaded, see
+                `datasets.load_dataset`. Defaults to a list of rows.
+            response_cache (ResponseCache): Cache of the page responses.
+                Defaults to None, no caching.
+            reload_interval (float): If given, the data file is checked
+                for changes at most every `reload_interval` seconds.
+                Defaults to None, loading it once.
+            prefetcher (Prefetcher): Reads the next pages of `get_hyper`
+                ahead. Defaults to None, no read-ahead.
+        """
+        super().__init__(backend, response_cache, reload_interval,
+                         prefetcher)
+        self.__keyset_index = None
+        self.__keyset_version = None
+
+    def keyset_index(self) -> KeysetIndex:
+        """Sorted and inverted indexes of the dataset, built on demand
+        and again after each reload
+        """
+        version = self.dataset_version()
+        if self.__keyset_index is None or self.__keyset_version != version:
+            dataset = self.dataset()
+            if hasattr(dataset, "snapshot"):
+                dataset = dataset.snapshot()
+            self.__keyset_index = KeysetIndex(dataset)
+            self.__keyset_version = version
+        return self.__keyset_index
+
+    @cached_response
+    def get_cursor(self, cursor: str = None, page_size: int = 10,
+                   sort: str = "-count,rank,name",
+                   **filters: Any) -> Dict[str, Any]:
+        """
+        Retrieve the page of sorted and filtered rows following a cursor.
+
+        The first call of a pagination sets its order and filters; the
+        `next_cursor` it returns carries them, so the following calls
+        only pass the cursor. Every page costs the same, however deep.
+
+        Args:
+            cursor (str): The `next_cursor` of the previous page. Defaults
+                to None, the first page.
+            page_size (int): number of items per page. Defaults to 10.
+            sort (str): Comma-separated fields among year, gender,
+                        ethnicity, name, count and rank, each prefixed
+                        with "-" for a descending order. Ignored when
+                        `cursor` is given.
+            **filters: Required values of year, gender, ethnicity or
+                        name. Ignored when `cursor` is given.
+
+        Returns:
+            Dict[str, Any]: A dictionary containing:
+                - page_size (int): The length of the current dataset page.
+                - data (List[List]): The dataset page as a list of records.
+                - next_cursor (Optional[str]): The cursor of the next page,
+                                        or None if there is no next page.
+                - sort (str): The order of the rows.
+                - filters (Dict[str, str]): The filters of the rows.
+                - total (int): The number of rows matching the filters.
+
+        Raises:
+            AssertionError: If `page_size` is not a positive integer.
+            ValueError: If `cursor` is malformed, or a sort field or a
+                        filter is unknown.
+        """
+        assert isinstance(page_size, int) and page_size > 0
+        after = None
+        if cursor is not None:
+            sort, filters, values, position = decode_cursor(cursor)
+            after = [values, position]
+        filters = {name: str(value) for name, value in filters.items()}
+
+        data, last, total = self.keyset_index().page(
+            sort, filters, after, page_size)
+        next_cursor = None
+        if last is not None:
+            next_cursor = encode_cursor([sort, filters] + last)
+
+        return {
+            "page_size": len(data),
+            "data": data,
+            "next_cursor": next_cursor,
+            "sort": sort,
+            "filters": filters,
+            "total": total
+        }
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Asynchronous hypermedia pagination
+"""
+
+import asyncio
+import json
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from datasets import IndexedDataset, load_dataset
+
+
+class AsyncServer:
+    """Server class to paginate a database of popular baby names
+    from asyncio code.
+
+    The dataset is loaded in a thread pool, so the event loop keeps
+    serving other requests meanwhile, and only once: concurrent first
+    requests all wait for the same load. Once loaded, pages are cut
+    without blocking.
+    """
+    DATA_FILE = "Popular_Baby_Names.csv"
+
+    def __init__(self, backend: str = "rows",
+                 executor: Optional[Executor] = None):
+        """
+        Initialize the server.
+
+        Args:
+            backend (str): How the dataset is stored once loaded, see
+                `datasets.load_dataset`. Defaults to a list of rows.
+            executor (Executor): Runs the blocking loads. Defaults to the
+                default executor of the event loop.
+        """
+        self.backend = backend
+        self.executor = executor
+        self.loads = 0
+        self.__dataset = None
+        self.__indexed_dataset = None
+        self.__loading = None
+
+    async def dataset(self) -> Sequence:
+        """Cached dataset, loaded once in the executor
+        """
+        if self.__dataset is None:
+            if self.__loading is None:
+                loop = asyncio.get_running_loop()
+                self.loads += 1
+                self.__loading = loop.run_in_executor(
+                    self.executor, load_dataset, self.DATA_FILE, self.backend)
+            loading = self.__loading
+            try:
+                dataset = await asyncio.shield(loading)
+            except Exception:
+                if self.__loading is loading:
+                    self.__loading = None
+                raise
+            if self.__dataset is None:
+                self.__dataset = dataset
+                self.__loading = None
+        return self.__dataset
+
+    async def indexed_dataset(self) -> IndexedDataset:
+        """Dataset indexed by sorting position, starting at 0
+        """
+        if self.__indexed_dataset is None:
+            dataset = await self.dataset()
+            if self.__indexed_dataset is None:
+                self.__indexed_dataset = IndexedDataset(dataset)
+        return self.__indexed_dataset
+
+    async def get_page(self, page: int = 1,
+                       page_size: int = 10) -> List[List]:
+        """
+        Retrieve a page of data from the dataset
+        based on the page number and page size.
+
+        Args:
+            page (int): page number to retrieve (1-based index). Defaults to 1.
+            page_size (int): number of items per page. Defaults to 10.
+
+        Returns:
+            List[List]: A list of rows representing the requested page of data.
+
+        Raises:
+            AssertionError: If `page` or `page_size` is not a positive integer.
+        """
+        assert isinstance(page, int) and page > 0
+        assert isinstance(page_size, int) and page_size > 0
+        start, end = index_range(page, page_size)
+        data = await self.dataset()
+        return data[start:end]
+
+    async def get_hyper(self, page: int = 1,
+                        page_size: int = 10) -> Dict[str, Any]:
+        """
+        Retrieve a paginated dataset along with additional information.
+
+        Args:
+            page (int): page number to retrieve (1-based index). Defaults to 1.
+            page_size (int): number of items per page. Defaults to 10.
+
+        Returns:
+            Dict[str, Any]: The same dictionary as `Server.get_hyper` in
+                            2-hypermedia_pagination.
+        """
+        data = await self.get_page(page, page_size)
+        total_pages = (len(await self.dataset()) + page_size - 1) // page_size
+        next_page = page + 1 if page < total_pages else None
+        prev_page = page - 1 if page > 1 else None
+
+        return {
+            "page_size": page_size,
+            "page": page,
+            "data": data,
+            "next_page": next_page,
+            "prev_page": prev_page,
+            "total_pages": total_pages
+        }
+
+    async def get_hyper_index(self, index: int = None,
+                              page_size: int = 10) -> Dict:
+        """
+        Retrieve a paginated dataset starting from a specified index
+        and return additional pagination metadata.
+
+        Args:
+            index (int): starting index for the current page in the dataset.
+                        Defaults to None, the first row.
+            page_size (int): The number of items per page. Defaults to 10.
+
+        Returns:
+            Dict: The same dictionary as `Server.get_hyper_index` in
+                  3-hypermedia_del_pagination.
+        """
+        indexed_dataset = await self.indexed_dataset()
+        if index is None:
+            index = 0
+        assert isinstance(index, int)
+        assert index >= 0 and index < indexed_dataset.stop
+        assert isinstance(page_size, int) and page_size > 0
+
+        positions = indexed_dataset.next_live(index, page_size + 1)
+        data = [indexed_dataset[i] for i in positions[:page_size]]
+        next_index = None
+        if len(positions) > page_size:
+            next_index = positions[page_size - 1] + 1
+
+        return {
+            "index": index,
+            "next_index": next_index,
+            "page_size": page_size,
+            "data": data
+        }
+
+
+METHODS = ("get_page", "get_hyper", "get_hyper_index")
+
+
+async def handle_client(server: AsyncServer, reader: asyncio.StreamReader,
+                        writer: asyncio.StreamWriter) -> None:
+    """
+    Answer the requests of one connection, one JSON object per line.
+
+    A request is `{"method": ..., "params": {...}}` with a method of
+    `METHODS`; the reply is `{"result": ...}` or `{"error": ...}`.
+    """
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                request = json.loads(line)
+                method = request["method"]
+                assert method in METHODS, "unknown method"
+                result = await getattr(server, method)(
+                    **request.get("params", {}))
+                reply = {"result": result}
+            except (AssertionError, KeyError, TypeError,
+                    ValueError) as error:
+                reply = {"error": "{}: {}".format(
+                    type(error).__name__, error)}
+            writer.write(json.dumps(reply).encode() + b"\n")
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(server: AsyncServer, host: str = "127.0.0.1",
+                port: int = 0) -> asyncio.AbstractServer:
+    """Start serving `server` over TCP, see `handle_client`"""
+    return await asyncio.start_server(
+        lambda reader, writer: handle_client(server, reader, writer),
+        host, port)
+
+
+def index_range(page: int, page_size: int) -> Tuple[int, int]:
+    """
+        Calculate the start and end index for pagination based on
+        the given page number and page size.
+
+        Args:
+            page (int): The current page number (1-based index).
+            page_size (int): The number of items per page.
+
+        Returns:
+            Tuple[int, int]: A tuple containing the start index and end index
+                         representing the range of items for the given page.
+    """
+
+    offset = (page - 1) * page_size
+    return offset, offset + page_size
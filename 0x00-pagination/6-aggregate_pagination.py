@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Hypermedia pagination of precomputed aggregates
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from aggregates import Aggregates
+from prefetch import Prefetcher
+from response_cache import ResponseCache, cached_response
+
+HyperServer = __import__('2-hypermedia_pagination').Server
+
+
+class Server(HyperServer):
+    """Server class to paginate a database of popular baby names,
+    and summaries of it: births per year, gender and ethnicity, per
+    name, and the names most given to each gender and ethnicity.
+
+    The summaries are computed once when the dataset is loaded, then
+    updated with the rows appended to it, so no request scans the rows.
+    """
+    def __init__(self, backend: str = "rows",
+                 response_cache: Optional[ResponseCache] = None,
+                 reload_interval: Optional[float] = None,
+                 prefetcher: Optional[Prefetcher] = None):
+        """
+        Initialize the server.
+
+        Args:
+            backend (str): How the dataset is stored once loaded, see
+                `datasets.load_dataset`. Defaults to a list of rows.
+            response_cache (ResponseCache): Cache of the page responses.
+                Defaults to None, no caching.
+            reload_interval (float): If given, the data file is checked
+                for changes at most every `reload_interval` seconds.
+                Defaults to None, loading it once.
+            prefetcher (Prefetcher): Reads the next pages of `get_hyper`
+                ahead. Defaults to None, no read-ahead.
+        """
+        super().__init__(backend, response_cache, reload_interval,
+                         prefetcher)
+        self.__aggregates = None
+
+    def aggregates(self) -> Aggregates:
+        """Summaries of the dataset, computed on first use and then
+        updated with the rows appended to it
+        """
+        if self.__aggregates is None:
+            self.__aggregates = Aggregates(self.dataset())
+        else:
+            self.__aggregates.sync()
+        return self.__aggregates
+
+    def dataset_version(self) -> Tuple[int, int]:
+        """Number of reloads of the dataset, and of changes made to the
+        summaries
+        """
+        reloads = super().dataset_version()
+        if self.__aggregates is None:
+            return reloads, 0
+        self.__aggregates.sync()
+        return reloads, self.__aggregates.version
+
+    @cached_response
+    def get_group_totals(self, page: int = 1, page_size: int = 10,
+                         **filters: Any) -> Dict[str, Any]:
+        """
+        Retrieve a page of the births per year, gender and ethnicity.
+
+        Args:
+            page (int): page number to retrieve (1-based index). Defaults to 1.
+            page_size (int): number of items per page. Defaults to 10.
+            **filters: Required values of year, gender or ethnicity.
+
+        Returns:
+            Dict[str, Any]: The dictionary of `get_hyper`, whose `data`
+                            holds `[year, gender, ethnicity, births, rows]`
+                            records ordered by year, gender and ethnicity.
+
+        Raises:
+            AssertionError: If `page` or `page_size` is not a positive integer.
+            ValueError: If a filter is unknown.
+        """
+        return paginate(self.aggregates().group_totals(**filters),
+                        page, page_size)
+
+    @cached_response
+    def get_name_totals(self, page: int = 1,
+                        page_size: int = 10) -> Dict[str, Any]:
+        """
+        Retrieve a page of the births per name, most given first.
+
+        Args:
+            page (int): page number to retrieve (1-based index). Defaults to 1.
+            page_size (int): number of items per page. Defaults to 10.
+
+        Returns:
+            Dict[str, Any]: The dictionary of `get_hyper`, whose `data`
+                            holds `[rank, name, births]` records.
+
+        Raises:
+            AssertionError: If `page` or `page_size` is not a positive integer.
+        """
+        return paginate(self.aggregates().name_totals(), page, page_size)
+
+    @cached_response
+    def get_top_names(self, gender: str, ethnicity: str, page: int = 1,
+                      page_size: int = 10) -> Dict[str, Any]:
+        """
+        Retrieve a page of the names of a gender and ethnicity, most given
+        first over all the years.
+
+        Args:
+            gender (str): The gender, such as "FEMALE".
+            ethnicity (str): The ethnicity, such as "HISPANIC".
+            page (int): page number to retrieve (1-based index). Defaults to 1.
+            page_size (int): number of items per page. Defaults to 10.
+
+        Returns:
+            Dict[str, Any]: The dictionary of `get_hyper`, whose `data`
+                            holds `[rank, name, births]` records.
+
+        Raises:
+            AssertionError: If `page` or `page_size` is not a positive integer.
+        """
+        return paginate(self.aggregates().top_names(gender, ethnicity),
+                        page, page_size)
+
+    def get_name_rank(self, name: str, gender: Optional[str] = None,
+                      ethnicity: Optional[str] = None) -> Optional[List]:
+        """
+        Retrieve the rank of a name, regardless of its case.
+
+        Args:
+            name (str): The name.
+            gender (str): With `ethnicity`, ranks the name within that
+                          gender and ethnicity. Defaults to None, ranking
+                          it among all the names.
+            ethnicity (str): See `gender`.
+
+        Returns:
+            Optional[List]: The `[rank, name, births]` of the name, or None
+                            if it was never given.
+        """
+        return self.aggregates().rank(name, gender, ethnicity)
+
+
+def paginate(items: Sequence, page: int = 1,
+             page_size: int = 10) -> Dict[str, Any]:
+    """
+    Cut a page of `items` into the dictionary returned by `get_hyper`.
+
+    Args:
+        items (Sequence): The records to paginate.
+        page (int): page number to retrieve (1-based index).
+        page_size (int): number of items per page.
+
+    Returns:
+        Dict[str, Any]: The same dictionary as `Server.get_hyper` in
+                        2-hypermedia_pagination.
+
+    Raises:
+        AssertionError: If `page` or `page_size` is not a positive integer.
+    """
+    assert isinstance(page, int) and page > 0
+    assert isinstance(page_size, int) and page_size > 0
+    start = (page - 1) * page_size
+    total_pages = (len(items) + page_size - 1) // page_size
+    next_page = page + 1 if page < total_pages else None
+    prev_page = page - 1 if page > 1 else None
+
+    return {
+        "page_size": page_size,
+        "page": page,
+        "data": items[start:start + page_size],
+        "next_page": next_page,
+        "prev_page": prev_page,
+        "total_pages": total_pages
+    }
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Materialized aggregates of the baby names dataset"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+GROUP_FILTERS = ("year", "gender", "ethnicity")
+
+
+class Aggregates:
+    """Group-by summaries of the rows, updated row by row
+
+    Three summaries are kept:
+      - the births and number of rows of every (year, gender, ethnicity)
+        group,
+      - the births of every name, over all the rows,
+      - the births of every name within each (gender, ethnicity) group,
+        over all the years.
+
+    Names are compared regardless of case (the file spells some of them
+    in capitals) and shown in title case.
+
+    Adding or removing a row updates the totals in O(1). The sorted
+    lists served to readers are computed on first use after a change,
+    each from its own summary only, never by scanning the rows.
+
+    Like `IndexedDataset`, `sync` follows a dataset that grows or is
+    reloaded, and `version` counts the changes.
+    """
+    def __init__(self, dataset: Sequence = ()):
+        """
+        Summarize every row of `dataset`.
+
+        Args:
+            dataset (Sequence): The rows, read but never modified.
+        """
+        self.dataset = dataset
+        self.version = 0
+        self.groups = {}
+        self.names = {}
+        self.group_names = {}
+        self.__sorted = {}
+        self.__synced = 0
+        self.__generation = getattr(dataset, "generation", 0)
+        self.sync()
+
+    def sync(self) -> int:
+        """
+        Summarize the rows appended to the dataset since the last sync.
+
+        If the dataset was reloaded entirely (its `generation` changed),
+        every row is summarized anew and the rows added or removed
+        through `add` and `remove` are dropped.
+
+        Returns:
+            int: The number of rows summarized.
+        """
+        rows = self.dataset
+        if hasattr(rows, "snapshot"):
+            rows = rows.snapshot()
+        if getattr(self.dataset, "generation", 0) != self.__generation:
+            version = self.version
+            self.__init__(self.dataset)
+            self.version = version + 1
+            return self.__synced
+        start, size = self.__synced, len(rows)
+        if size <= start:
+            return 0
+        self.__synced = size
+        for row in rows[start:size]:
+            self._count(row, 1)
+        self.version += 1
+        self.__sorted.clear()
+        return size - start
+
+    def add(self, row: List[str]) -> None:
+        """Count a row stored outside of the dataset"""
+        self._count(row, 1)
+        self.version += 1
+        self.__sorted.clear()
+
+    def remove(self, row: List[str]) -> None:
+        """Stop counting a row deleted or replaced"""
+        self._count(row, -1)
+        self.version += 1
+        self.__sorted.clear()
+
+    def group_totals(self, **filters: str) -> List[List]:
+        """
+        Return the `[year, gender, ethnicity, births, rows]` of each
+        group, ordered by year, gender and ethnicity.
+
+        Args:
+            **filters: Required values of year, gender or ethnicity.
+
+        Raises:
+            ValueError: If a filter is unknown.
+        """
+        for name in filters:
+            if name not in GROUP_FILTERS:
+                raise ValueError("unknown filter: {!r}".format(name))
+        key = ("groups",) + tuple(sorted(filters.items()))
+        totals = self.__sorted.get(key)
+        if totals is None:
+            wanted = [(GROUP_FILTERS.index(name), str(value))
+                      for name, value in filters.items()]
+            totals = [list(group) + total
+                      for group, total in sorted(self.groups.items())
+                      if all(group[i] == value for i, value in wanted)]
+            self.__sorted[key] = totals
+        return totals
+
+    def name_totals(self) -> List[List]:
+        """
+        Return the `[rank, name, births]` of every name, most given
+        first; names given as often share their rank.
+        """
+        return self._ranked(("names",), self.names)
+
+    def top_names(self, gender: str, ethnicity: str) -> List[List]:
+        """
+        Return the `[rank, name, births]` of every name of a gender and
+        ethnicity over all the years, most given first.
+        """
+        return self._ranked(("top", gender, ethnicity),
+                            self.group_names.get((gender, ethnicity), {}))
+
+    def rank(self, name: str, gender: Optional[str] = None,
+             ethnicity: Optional[str] = None) -> Optional[List]:
+        """
+        Return the `[rank, name, births]` of a name, over all the rows
+        or within a gender and ethnicity, None if it was never given.
+        """
+        if gender is None and ethnicity is None:
+            ranked = self.name_totals()
+            key = ("names", "positions")
+        else:
+            ranked = self.top_names(gender, ethnicity)
+            key = ("top", gender, ethnicity, "positions")
+        positions = self.__sorted.get(key)
+        if positions is None:
+            positions = {entry[1]: i for i, entry in enumerate(ranked)}
+            self.__sorted[key] = positions
+        position = positions.get(name.title())
+        return None if position is None else ranked[position]
+
+    def _count(self, row: List[str], sign: int) -> None:
+        """Add a row to the totals, or subtract it if `sign` is -1"""
+        year, gender, ethnicity, name, count = row[:5]
+        births = sign * int(count)
+        name = name.title()
+        group = self.groups.setdefault((year, gender, ethnicity), [0, 0])
+        group[0] += births
+        group[1] += sign
+        if group[1] == 0:
+            del self.groups[(year, gender, ethnicity)]
+        _bump(self.names, name, births)
+        _bump(self.group_names.setdefault((gender, ethnicity), {}),
+              name, births)
+
+    def _ranked(self, key: Tuple, totals: Dict[str, int]) -> List[List]:
+        """Return `totals` ranked, computed once per change"""
+        ranked = self.__sorted.get(key)
+        if ranked is None:
+            ranked = []
+            for births, name in sorted((-births, name)
+                                       for name, births in totals.items()):
+                rank = len(ranked) + 1
+                if ranked and ranked[-1][2] == -births:
+                    rank = ranked[-1][0]
+                ranked.append([rank, name, -births])
+            self.__sorted[key] = ranked
+        return ranked
+
+
+def _bump(totals: Dict[str, int], name: str, births: int) -> None:
+    """Add `births` to the total of `name`, dropping it at zero"""
+    total = totals.get(name, 0) + births
+    if total:
+        totals[name] = total
+    else:
+        totals.pop(name, None)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Load benchmark of the asynchronous pagination server
+
+Usage: ./bench_async.py [clients] [requests_per_client] [backend]
+
+Starts an `AsyncServer` behind its JSON-lines TCP front end, opens
+`clients` concurrent connections that all start at once (so the first
+requests race for the cold dataset), and has each send its requests
+one after the other, mixing get_hyper and get_hyper_index on random
+pages. Reports requests/sec, latency percentiles and how many times the
+dataset was loaded.
+"""
+
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import List
+
+AsyncServer = __import__('5-async_pagination').AsyncServer
+serve = __import__('5-async_pagination').serve
+
+
+async def client(port: int, seed: int, requests: int,
+                 latencies: List[float]) -> None:
+    """Send `requests` random page requests over one connection"""
+    rand = random.Random(seed)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for _ in range(requests):
+        if rand.random() < 0.5:
+            request = {"method": "get_hyper",
+                       "params": {"page": rand.randint(1, 1900),
+                                  "page_size": 10}}
+        else:
+            request = {"method": "get_hyper_index",
+                       "params": {"index": rand.randrange(19000),
+                                  "page_size": 10}}
+        start = time.perf_counter()
+        writer.write(json.dumps(request).encode() + b"\n")
+        reply = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        assert "result" in reply, reply
+    writer.close()
+    await writer.wait_closed()
+
+
+async def main(clients: int, requests: int, backend: str) -> None:
+    """Run the benchmark and print its results"""
+    server = AsyncServer(backend)
+    listener = await serve(server)
+    port = listener.sockets[0].getsockname()[1]
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, n, requests, latencies)
+                           for n in range(clients)))
+    elapsed = time.perf_counter() - start
+    listener.close()
+    await listener.wait_closed()
+    latencies.sort()
+    print("{} clients x {} requests, {} backend".format(
+        clients, requests, backend))
+    print("{:>12.0f} requests/s".format(len(latencies) / elapsed))
+    for label, q in (("p50", 0.5), ("p99", 0.99), ("max", 1.0)):
+        value = latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+        print("{:>12.3f} ms {}".format(value * 1000, label))
+    print("{:>12d} dataset load(s)".format(server.loads))
+
+
+if __name__ == "__main__":
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    backend = sys.argv[3] if len(sys.argv) > 3 else "rows"
+    asyncio.run(main(clients, requests, backend))
@@ -0,0 +1,993 @@
+#!/usr/bin/env python3
+"""Storage backends for the datasets served by the pagination servers"""
+
+import csv
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableMapping, Sequence
+from typing import (Callable, Dict, Iterable, Iterator, List, Optional,
+                    Union)
+
+
+def load_rows(path: str) -> List[List[str]]:
+    """
+    Load a CSV file as a list of rows of strings, without its header.
+
+    Args:
+        path (str): The CSV file to load.
+
+    Returns:
+        List[List[str]]: One list of field values per data row.
+    """
+    with open(path) as f:
+        reader = csv.reader(f)
+        dataset = [row for row in reader]
+    return dataset[1:]
+
+
+def file_digest(path: str) -> str:
+    """Return the BLAKE2 digest of a file, in hexadecimal"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class IntColumn:
+    """Column of non-negative integers kept in the smallest typed array
+
+    Values are parsed from their text and turned back into the same
+    text on read, so only canonical integers ("17", not "017" or "+17")
+    are accepted.
+
+    `values` may also be a read-only `memoryview` over a mapped file;
+    it is copied into an array on the first append.
+    """
+    TYPECODES = "BHIQ"
+
+    def __init__(self):
+        self.values = array(self.TYPECODES[0])
+
+    @property
+    def typecode(self) -> str:
+        """Return the array typecode of the values"""
+        if isinstance(self.values, memoryview):
+            return self.values.format
+        return self.values.typecode
+
+    def append(self, text: str) -> None:
+        """
+        Append the integer written in `text`.
+
+        Raises:
+            ValueError: If `text` is not a canonical non-negative integer.
+        """
+        self.extend((text,))
+
+    def extend(self, texts: Iterable[str]) -> None:
+        """
+        Append the integers written in `texts`.
+
+        Raises:
+            ValueError: If a text is not a canonical non-negative integer,
+                in which case none of them is appended.
+        """
+        texts = list(texts)
+        for text in texts:
+            if not text.isdigit() or (text[0] == "0" and text != "0"):
+                raise ValueError(
+                    "not a canonical integer: {!r}".format(text))
+        self._extend(list(map(int, texts)))
+
+    def text(self, i: int) -> str:
+        """Return the text of the value at position `i`"""
+        return str(self.values[i])
+
+    def texts(self, key: slice) -> List[str]:
+        """Return the texts of the values selected by the slice `key`"""
+        return list(map(str, self.values[key]))
+
+    def nbytes(self) -> int:
+        """Return the size of the column storage, in bytes"""
+        return self.values.itemsize * len(self.values)
+
+    def _extend(self, values: List[int]) -> None:
+        """Append `values`, widening the array first if one does not fit"""
+        if values:
+            if isinstance(self.values, memoryview):
+                self.values = array(self.typecode, self.values)
+            self._widen(max(values))
+            self.values.extend(values)
+
+    def _widen(self, value: int) -> None:
+        """Move the values to a wider typecode if `value` does not fit"""
+        for code in self.TYPECODES[self.TYPECODES.index(self.typecode):]:
+            try:
+                array(code, [value])
+            except OverflowError:
+                continue
+            if code != self.typecode:
+                self.values = array(code, self.values)
+            return
+        raise OverflowError("integer too large: {}".format(value))
+
+
+class CategoryColumn(IntColumn):
+    """Column of strings stored as codes into a table of distinct labels
+
+    Each distinct string is kept once, in `labels`; the rows only hold
+    its position in a typed array of codes.
+    """
+    def __init__(self, texts: Iterable[str] = ()):
+        super().__init__()
+        self.labels = []
+        self.codes = {}
+        self.extend(texts)
+
+    def extend(self, texts: Iterable[str]) -> None:
+        """Append `texts`, adding the new ones to the labels"""
+        codes, labels = self.codes, self.labels
+        values = []
+        for text in texts:
+            code = codes.get(text)
+            if code is None:
+                code = codes[text] = len(labels)
+                labels.append(text)
+            values.append(code)
+        self._extend(values)
+
+    def text(self, i: int) -> str:
+        """Return the text of the value at position `i`"""
+        return self.labels[self.values[i]]
+
+    def texts(self, key: slice) -> List[str]:
+        """Return the texts of the values selected by the slice `key`"""
+        return list(map(self.labels.__getitem__, self.values[key]))
+
+    def nbytes(self) -> int:
+        """Return the size of the codes and of the labels, in bytes"""
+        return super().nbytes() + sum(len(label) for label in self.labels)
+
+
+class ColumnarDataset(Sequence):
+    """Dataset stored column by column in typed arrays
+
+    Columns holding only canonical non-negative integers (Year of Birth,
+    Count, Rank) are stored as numbers; the other ones (Gender,
+    Ethnicity, names) as categorical codes. Indexing and slicing still
+    return rows shaped like the ones of `load_rows`, lists of strings,
+    so the dataset is a drop-in replacement for the list of rows.
+
+    Aggregations can work on whole columns at once through `column`
+    (or `to_numpy` when NumPy is installed) instead of on rows.
+    """
+    SIDECAR_MAGIC = b"COLSIDE1"
+
+    def __init__(self, header: List[str], rows: Iterable[List[str]] = ()):
+        """
+        Initialize a dataset with the given column names and rows.
+
+        Args:
+            header (List[str]): The column names.
+            rows (Iterable[List[str]]): The initial rows.
+        """
+        self.header = list(header)
+        self.columns = [IntColumn() for _ in self.header]
+        self.__length = 0
+        self.extend(rows)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "ColumnarDataset":
+        """Load a CSV file whose first row is the header, empty if the
+        file is"""
+        with open(path) as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return cls([])
+            return cls(header, reader)
+
+    def __len__(self) -> int:
+        """Return the number of rows"""
+        return self.__length
+
+    def __getitem__(self, key: Union[int, slice]) -> List:
+        """
+        Return a row, or a list of rows for a slice.
+
+        Raises:
+            IndexError: If `key` is an integer out of range.
+        """
+        if isinstance(key, slice):
+            fields = [column.texts(key) for column in self.columns]
+            return [list(row) for row in zip(*fields)]
+        if key < 0:
+            key += self.__length
+        if not 0 <= key < self.__length:
+            raise IndexError("dataset index out of range")
+        return [column.text(key) for column in self.columns]
+
+    def append(self, row: List[str]) -> None:
+        """
+        Append one row.
+
+        Raises:
+            ValueError: If `row` does not have one value per column.
+        """
+        self.extend((row,))
+
+    def extend(self, rows: Iterable[List[str]]) -> None:
+        """
+        Append several rows, column by column.
+
+        A number column receiving a value that is not a canonical
+        integer becomes a category column.
+
+        Raises:
+            ValueError: If a row does not have one value per column, in
+                which case none of the rows is appended.
+        """
+        rows = [row for row in rows]
+        for row in rows:
+            if len(row) != len(self.columns):
+                raise ValueError("expected {} fields, got {}".format(
+                    len(self.columns), len(row)))
+        if not rows:
+            return
+        for i, texts in enumerate(zip(*rows)):
+            column = self.columns[i]
+            try:
+                column.extend(texts)
+            except ValueError:
+                column = self.columns[i] = CategoryColumn(
+                    column.texts(slice(None)))
+                column.extend(texts)
+        self.__length += len(rows)
+
+    def column(self, name: str) -> array:
+        """
+        Return the typed array of a column.
+
+        For a category column, the array holds codes into `labels(name)`.
+        The array is the storage itself and must not be modified.
+        """
+        return self.columns[self.header.index(name)].values
+
+    def labels(self, name: str) -> Union[List[str], None]:
+        """Return the labels of a category column, None for a number one"""
+        return getattr(self.columns[self.header.index(name)], "labels", None)
+
+    def to_numpy(self, name: str):
+        """
+        Return a column as a NumPy array: a read-only view of a column
+        mapped from a sidecar, a copy otherwise.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        import numpy
+
+        column = self.columns[self.header.index(name)]
+        if isinstance(column.values, memoryview):
+            return numpy.frombuffer(column.values, dtype=column.typecode)
+        return numpy.array(column.values, dtype=column.typecode)
+
+    def nbytes(self) -> int:
+        """Return the size of the column storage, in bytes"""
+        return sum(column.nbytes() for column in self.columns)
+
+    @classmethod
+    def from_sidecar(cls, path: str,
+                     sidecar_path: Optional[str] = None) -> "ColumnarDataset":
+        """
+        Load a CSV file from its binary sidecar, written on first use.
+
+        The sidecar (`<path>.cols`) holds the header, the labels of the
+        category columns and the packed column arrays. The arrays are
+        mapped from the file rather than read, so loading costs about
+        the same whatever the number of rows. The sidecar records the
+        size, modification time and BLAKE2 digest of the CSV file; it
+        is used when the size matches and either the time or the digest
+        does, and rewritten otherwise. A sidecar matched by digest is
+        rewritten with the new time, so the next load skips the digest.
+
+        Args:
+            path (str): The CSV file, whose first row is the header.
+            sidecar_path (str): The sidecar file. Defaults to the path
+                of the CSV file followed by ".cols".
+        """
+        if sidecar_path is None:
+            sidecar_path = path + ".cols"
+        stat = os.stat(path)
+        dataset = cls._read_sidecar(sidecar_path, path, stat)
+        if dataset is None:
+            digest = file_digest(path)
+            dataset = cls.from_csv(path)
+            dataset._write_sidecar(sidecar_path, stat, digest)
+        return dataset
+
+    @classmethod
+    def _read_sidecar(cls, sidecar_path: str, path: str,
+                      stat: os.stat_result) -> Optional["ColumnarDataset"]:
+        """Map the sidecar of `path`, None if it is missing or stale"""
+        try:
+            with open(sidecar_path, "rb") as f:
+                if f.read(len(cls.SIDECAR_MAGIC)) != cls.SIDECAR_MAGIC:
+                    return None
+                size, = struct.unpack("<Q", f.read(8))
+                meta = json.loads(f.read(size))
+                if (meta["size"] != stat.st_size or
+                        meta["byteorder"] != sys.byteorder):
+                    return None
+                touched = meta["mtime_ns"] != stat.st_mtime_ns
+                if touched and meta["digest"] != file_digest(path):
+                    return None
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError, KeyError, struct.error):
+            return None
+        dataset = cls(meta["header"])
+        view = memoryview(data)
+        for i, spec in enumerate(meta["columns"]):
+            if "labels" in spec:
+                column = CategoryColumn(())
+                column.labels = spec["labels"]
+                column.codes = {text: code for code, text in
+                                enumerate(column.labels)}
+            else:
+                column = IntColumn()
+            end = spec["offset"] + spec["nbytes"]
+            column.values = view[spec["offset"]:end].cast(spec["typecode"])
+            dataset.columns[i] = column
+        dataset.__length = meta["length"]
+        if touched:
+            dataset._write_sidecar(sidecar_path, stat, meta["digest"])
+        return dataset
+
+    def _write_sidecar(self, sidecar_path: str, stat: os.stat_result,
+                       digest: str) -> None:
+        """Write the sidecar, ignoring a read-only location"""
+        specs = []
+        for column in self.columns:
+            spec = {"typecode": column.typecode, "nbytes": column.nbytes()}
+            if isinstance(column, CategoryColumn):
+                spec["labels"] = column.labels
+                spec["nbytes"] = len(column.values) * column.values.itemsize
+            specs.append(spec)
+        meta = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                "digest": digest, "byteorder": sys.byteorder,
+                "header": self.header, "length": len(self),
+                "columns": specs}
+        start = len(self.SIDECAR_MAGIC) + 8
+        moved = True
+        while moved:
+            moved = False
+            offset = start + len(json.dumps(meta).encode())
+            for spec in specs:
+                offset += -offset % 8
+                moved = moved or spec.get("offset") != offset
+                spec["offset"] = offset
+                offset += spec["nbytes"]
+        temporary = "{}.{}.tmp".format(sidecar_path, os.getpid())
+        try:
+            with open(temporary, "wb") as f:
+                header = json.dumps(meta).encode()
+                f.write(self.SIDECAR_MAGIC)
+                f.write(struct.pack("<Q", len(header)))
+                f.write(header)
+                for spec, column in zip(specs, self.columns):
+                    f.write(bytes(spec["offset"] - f.tell()))
+                    f.write(bytes(column.values))
+            os.replace(temporary, sidecar_path)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+
+
+class StreamingDataset(Sequence):
+    """Dataset read lazily from a memory-mapped CSV file
+
+    Opening the dataset only records where each row starts in the file,
+    in one pass over it; rows are parsed when they are read, so a page
+    only costs the parsing of its own rows, whatever the file size. The
+    row offsets are saved to a sidecar index file (`<path>.idx`) and
+    reused while the CSV keeps the same size and modification time.
+
+    Rows are found by counting quotes, so quoted fields may contain line
+    breaks.
+    """
+    INDEX_MAGIC = b"CSVIDX01"
+    INDEX_HEADER = struct.Struct("<8sQQQ")
+
+    def __init__(self, path: str, encoding: str = "utf-8",
+                 index_path: Optional[str] = None, sidecar: bool = True):
+        """
+        Map a CSV file and index its rows.
+
+        Args:
+            path (str): The CSV file, whose first row is the header.
+            encoding (str): The text encoding of the file.
+            index_path (str): The sidecar index file. Defaults to the
+                path of the CSV file followed by ".idx".
+            sidecar (bool): Whether to read and write the sidecar index.
+        """
+        self.path = path
+        self.encoding = encoding
+        self.index_path = path + ".idx" if index_path is None else index_path
+        self.__file = open(path, "rb")
+        stat = os.fstat(self.__file.fileno())
+        if stat.st_size:
+            self.__map = mmap.mmap(self.__file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        else:
+            self.__map = b""
+        starts = self._load_index(stat) if sidecar else None
+        if starts is None:
+            starts = self._build_index()
+            if sidecar:
+                self._save_index(stat, starts)
+        header = self._parse(starts[0], starts[1]) if len(starts) > 1 else []
+        self.header = header[0] if header else []
+        self.offsets = starts[1:] if len(starts) > 1 else starts
+
+    def __len__(self) -> int:
+        """Return the number of rows"""
+        return len(self.offsets) - 1
+
+    def __getitem__(self, key: Union[int, slice]) -> List:
+        """
+        Return a row, or a list of rows for a slice.
+
+        Raises:
+            IndexError: If `key` is an integer out of range.
+        """
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            if start >= stop:
+                return []
+            return self._parse(self.offsets[start], self.offsets[stop])
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("dataset index out of range")
+        return self._parse(self.offsets[key], self.offsets[key + 1])[0]
+
+    def close(self) -> None:
+        """Unmap and close the CSV file"""
+        if isinstance(self.__map, mmap.mmap):
+            self.__map.close()
+        self.__file.close()
+
+    def _parse(self, begin: int, end: int) -> List[List[str]]:
+        """Parse the rows stored between two byte offsets"""
+        text = self.__map[begin:end].decode(self.encoding)
+        return list(csv.reader(io.StringIO(text, newline="")))
+
+    def grow(self) -> int:
+        """
+        Index the complete rows appended to the file since it was mapped.
+
+        The file must have ended with a complete row. Rows already read
+        are not affected, so readers may keep paginating meanwhile. A
+        last row without its line break is left for a later call.
+
+        Returns:
+            int: The number of new rows.
+        """
+        size = os.fstat(self.__file.fileno()).st_size
+        end = self.offsets[-1]
+        if size <= end:
+            return 0
+        data = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        size = data.rfind(b"\n") + 1
+        if size <= end:
+            return 0
+        starts = self._scan(data, end, size)
+        count = len(self)
+        self.__map = data
+        self.offsets.extend(starts[1:])
+        return len(self) - count
+
+    def _build_index(self) -> array:
+        """
+        Scan the file for the start of every row, header included.
+
+        Returns:
+            array: The start offsets, followed by the size of the file.
+        """
+        return self._scan(self.__map, 0, len(self.__map))
+
+    @staticmethod
+    def _scan(data: Union[mmap.mmap, bytes], position: int,
+              size: int) -> array:
+        """Return the start of every row from `position` up to `size`,
+        then `size`"""
+        starts = array("Q")
+        quotes = 0
+        while position < size:
+            if not quotes:
+                starts.append(position)
+            end = data.find(b"\n", position)
+            end = size if end < 0 else end + 1
+            quotes += data[position:end].count(b'"')
+            quotes %= 2
+            position = end
+        starts.append(size)
+        return starts
+
+    def _load_index(self, stat: os.stat_result) -> Optional[array]:
+        """Return the offsets of the sidecar index, None if it is stale"""
+        try:
+            with open(self.index_path, "rb") as f:
+                magic, size, mtime, count = self.INDEX_HEADER.unpack(
+                    f.read(self.INDEX_HEADER.size))
+                if (magic, size, mtime) != (self.INDEX_MAGIC, stat.st_size,
+                                            stat.st_mtime_ns):
+                    return None
+                starts = array("Q")
+                starts.fromfile(f, count)
+        except (OSError, EOFError, struct.error):
+            return None
+        return starts
+
+    def _save_index(self, stat: os.stat_result, starts: array) -> None:
+        """Write the sidecar index, ignoring a read-only location"""
+        temporary = "{}.{}.tmp".format(self.index_path, os.getpid())
+        try:
+            with open(temporary, "wb") as f:
+                f.write(self.INDEX_HEADER.pack(
+                    self.INDEX_MAGIC, stat.st_size, stat.st_mtime_ns,
+                    len(starts)))
+                starts.tofile(f)
+            os.replace(temporary, self.index_path)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+
+
+class Snapshot(Sequence):
+    """Read-only view of the first `length` rows of a growing dataset
+
+    Rows are only ever appended to the dataset, so the view keeps
+    showing the same rows however much it grows afterwards.
+    """
+    __slots__ = ("rows", "length", "version")
+
+    def __init__(self, rows: Sequence, length: int, version: int = 0):
+        self.rows = rows
+        self.length = length
+        self.version = version
+
+    def __len__(self) -> int:
+        """Return the number of rows in the view"""
+        return self.length
+
+    def __getitem__(self, key: Union[int, slice]) -> List:
+        """
+        Return a row, or a list of rows for a slice.
+
+        Raises:
+            IndexError: If `key` is an integer out of range.
+        """
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.length)
+            if step < 0:
+                return [self.rows[i] for i in range(start, stop, step)]
+            return self.rows[start:stop:step]
+        if key < 0:
+            key += self.length
+        if not 0 <= key < self.length:
+            raise IndexError("dataset index out of range")
+        return self.rows[key]
+
+
+class RowView(Sequence):
+    """Read-only view of the rows `start` to `stop` of a dataset
+
+    Making or slicing a view copies nothing: rows are read from the
+    dataset when accessed, and iterating reads them in slices of `CHUNK`
+    rows, which the columnar and streaming backends decode in one go.
+    A view of a `LiveDataset` keeps the snapshot current when it was
+    made.
+
+    The rows of the "rows" backend are the stored lists themselves and
+    must not be modified.
+    """
+    __slots__ = ("rows", "start", "stop")
+    CHUNK = 1024
+
+    def __init__(self, rows: Sequence, start: int = 0,
+                 stop: Optional[int] = None):
+        """
+        Initialize a view, clamping `start` and `stop` like a slice.
+
+        Args:
+            rows (Sequence): The dataset.
+            start (int): The first row of the view. Defaults to 0.
+            stop (int): The row after the last one of the view. Defaults
+                to None, the end of the dataset.
+        """
+        if isinstance(rows, LiveDataset):
+            rows = rows.snapshot()
+        start, stop, _ = slice(start, stop).indices(len(rows))
+        self.rows = rows
+        self.start = start
+        self.stop = max(start, stop)
+
+    def __len__(self) -> int:
+        """Return the number of rows in the view"""
+        return self.stop - self.start
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[List, "RowView"]:
+        """
+        Return a row, a view for a slice, or a list of rows for a slice
+        with a step.
+
+        Raises:
+            IndexError: If `key` is an integer out of range.
+        """
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            view = RowView.__new__(RowView)
+            view.rows = self.rows
+            view.start = self.start + start
+            view.stop = self.start + max(start, stop)
+            return view
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("view index out of range")
+        return self.rows[self.start + key]
+
+    def __iter__(self) -> Iterator[List]:
+        """Iterate over the rows, reading them a chunk at a time"""
+        for begin in range(self.start, self.stop, self.CHUNK):
+            yield from self.rows[begin:min(begin + self.CHUNK, self.stop)]
+
+    def __repr__(self) -> str:
+        """Return the view as the list of its rows would be shown"""
+        return repr(list(self))
+
+
+class LiveDataset(Sequence):
+    """Dataset following the changes of its CSV file
+
+    The file is checked at most every `interval` seconds when the
+    dataset is read, or when `refresh` is called. A file that only grew,
+    keeping its previous content, has its new rows parsed and appended
+    to the loaded ones; any other change reloads it entirely.
+
+    Readers see the `Snapshot` current when they read: a refresh builds
+    the next one aside and swaps it in, so each read sees either the old
+    rows or the new ones. Appending never moves the existing rows, so a
+    pagination in progress just finds the new rows at the end.
+
+    `version` counts the refreshes that changed the rows, `generation`
+    the ones that reloaded them entirely (and so may have moved rows).
+    """
+    TAIL = 4096
+
+    def __init__(self, path: str, backend: str = "rows",
+                 interval: Optional[float] = None):
+        """
+        Load a CSV file.
+
+        Args:
+            path (str): The CSV file to load.
+            backend (str): The storage backend, see `load_dataset`.
+            interval (float): The minimum time between two automatic
+                checks of the file, in seconds. Defaults to None, only
+                checking it on `refresh`.
+        """
+        self.path = path
+        self.backend = backend
+        self.interval = interval
+        self.generation = 0
+        self.__version = 0
+        self.__lock = threading.Lock()
+        self.__checked = time.monotonic()
+        self._reload()
+
+    @property
+    def version(self) -> int:
+        """Number of the current snapshot, checking the file if it is time
+        to"""
+        return self.snapshot().version
+
+    def snapshot(self) -> Snapshot:
+        """Return the current rows, checking the file if it is time to"""
+        if (self.interval is not None and
+                time.monotonic() - self.__checked >= self.interval):
+            self.refresh(wait=False)
+        return self.__current
+
+    def __len__(self) -> int:
+        """Return the number of rows"""
+        return len(self.snapshot())
+
+    def __getitem__(self, key: Union[int, slice]) -> List:
+        """Return a row, or a list of rows for a slice"""
+        return self.snapshot()[key]
+
+    def refresh(self, wait: bool = True) -> bool:
+        """
+        Apply the changes of the file, if any.
+
+        Args:
+            wait (bool): Whether to wait for a refresh already running
+                in another thread, rather than skip this one.
+
+        Returns:
+            bool: Whether the rows changed.
+        """
+        if not self.__lock.acquire(blocking=wait):
+            return False
+        try:
+            self.__checked = time.monotonic()
+            stat = os.stat(self.path)
+            size, mtime, tail, complete = self.__fingerprint
+            if (stat.st_size, stat.st_mtime_ns) == (size, mtime):
+                return False
+            if (complete and stat.st_size > size and
+                    self._tail(size) == tail):
+                return self._append()
+            self._reload()
+            self.generation += 1
+            return True
+        finally:
+            self.__lock.release()
+
+    def _reload(self) -> None:
+        """Load the whole file and make it the current snapshot"""
+        while True:
+            before = os.stat(self.path)
+            rows = load_dataset(self.path, self.backend)
+            after = os.stat(self.path)
+            if ((before.st_size, before.st_mtime_ns) ==
+                    (after.st_size, after.st_mtime_ns)):
+                break
+        self.__rows = rows
+        self.__fingerprint = self._fingerprint(after.st_size,
+                                               after.st_mtime_ns)
+        self._publish()
+
+    def _append(self) -> bool:
+        """
+        Append the complete rows written after the loaded content,
+        leaving a row still being written for a later refresh.
+
+        Returns:
+            bool: Whether some rows were appended.
+        """
+        size = self.__fingerprint[0]
+        if isinstance(self.__rows, StreamingDataset):
+            if not self.__rows.grow():
+                return False
+            end = self.__rows.offsets[-1]
+        else:
+            with open(self.path, "rb") as f:
+                f.seek(size)
+                data = f.read()
+            data = data[:data.rfind(b"\n") + 1]
+            rows = list(csv.reader(io.StringIO(data.decode(),
+                                               newline="")))
+            if not rows:
+                return False
+            self.__rows.extend(rows)
+            end = size + len(data)
+        self.__fingerprint = self._fingerprint(
+            end, os.stat(self.path).st_mtime_ns)
+        self._publish()
+        return True
+
+    def _publish(self) -> None:
+        """Swap in a snapshot of every row loaded so far"""
+        self.__version += 1
+        self.__current = Snapshot(self.__rows, len(self.__rows),
+                                  self.__version)
+
+    def _fingerprint(self, size: int, mtime: int) -> tuple:
+        """Return what identifies the first `size` bytes of the file"""
+        with open(self.path, "rb") as f:
+            f.seek(max(0, size - 1))
+            complete = f.read(1) == b"\n"
+        return size, mtime, self._tail(size), complete
+
+    def _tail(self, size: int) -> bytes:
+        """Return a digest of the last bytes before offset `size`"""
+        with open(self.path, "rb") as f:
+            f.seek(max(0, size - self.TAIL))
+            data = f.read(min(size, self.TAIL))
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+
+BACKENDS: Dict[str, Callable[[str], Sequence]] = {
+    "rows": load_rows,
+    "columnar": ColumnarDataset.from_csv,
+    "stream": StreamingDataset,
+    "sidecar": ColumnarDataset.from_sidecar,
+}
+
+
+def load_dataset(path: str, backend: str = "rows",
+                 reload_interval: Optional[float] = None) -> Sequence:
+    """
+    Load a CSV file with one of the storage backends.
+
+    Args:
+        path (str): The CSV file to load.
+        backend (str): A key of `BACKENDS`:
+            - "rows": a list of lists of strings.
+            - "columnar": a `ColumnarDataset`.
+            - "stream": a `StreamingDataset`.
+            - "sidecar": a `ColumnarDataset` mapped from a binary
+              sidecar file, see `ColumnarDataset.from_sidecar`.
+        reload_interval (float): If given, return a `LiveDataset`
+            following the changes of the file, checked at most every
+            `reload_interval` seconds.
+
+    Returns:
+        Sequence: The rows of the file, without its header.
+
+    Raises:
+        KeyError: If `backend` is unknown.
+    """
+    if reload_interval is not None:
+        return LiveDataset(path, backend, reload_interval)
+    return BACKENDS[backend](path)
+
+
+class IndexedDataset(MutableMapping):
+    """Rows of a dataset keyed by their position, resilient to deletions
+
+    Positions are stable: deleting a row leaves a hole and the following
+    rows keep their index, like deleting keys from a dictionary of the
+    rows. The dataset is not copied, it is read through; rows stored
+    later are kept aside, either in holes or past the end.
+
+    The positions of the live rows are kept sorted in an array, so the
+    next `count` live rows from any position are found in
+    O(log n + count), however many deleted rows they skip. Deleting or
+    storing a row moves the tail of that array, a single memmove.
+
+    `version` counts the changes, so that results computed from the
+    rows can tell when they are stale.
+    """
+    def __init__(self, dataset: Sequence):
+        """
+        Index every row of `dataset` by its position.
+
+        Args:
+            dataset (Sequence): The rows, read but never modified.
+        """
+        self.dataset = dataset
+        self.version = 0
+        self.__stored = {}
+        self.__live = array("q", range(len(dataset)))
+        self.__alive = bytearray(b"\x01") * len(dataset)
+        self.__synced = len(self.__alive)
+        self.__generation = getattr(dataset, "generation", 0)
+
+    def sync(self) -> int:
+        """
+        Index the rows appended to the dataset since it was indexed.
+
+        A position already used by a stored row, or by its hole, keeps
+        it. If the dataset was reloaded entirely (its `generation`
+        changed), every row is indexed anew and the deletions and
+        stored rows are dropped.
+
+        Returns:
+            int: The number of positions added.
+        """
+        if getattr(self.dataset, "generation", 0) != self.__generation:
+            version = self.version
+            self.__init__(self.dataset)
+            self.version = version + 1
+            return len(self)
+        size = len(self.dataset)
+        start = max(self.__synced, len(self.__alive))
+        self.__synced = max(self.__synced, size)
+        if size <= start:
+            return 0
+        self.__alive.extend(b"\x01" * (size - start))
+        self.__live.extend(range(start, size))
+        self.version += 1
+        return size - start
+
+    @property
+    def stop(self) -> int:
+        """One past the highest position ever used"""
+        return len(self.__alive)
+
+    def __getitem__(self, index: int) -> List:
+        """
+        Return the row at `index`.
+
+        Raises:
+            KeyError: If there is no row at `index`.
+        """
+        if index not in self:
+            raise KeyError(index)
+        row = self.__stored.get(index)
+        return self.dataset[index] if row is None else row
+
+    def __setitem__(self, index: int, row: List) -> None:
+        """Store or replace the row at `index`, which may be a hole"""
+        if not isinstance(index, int) or index < 0:
+            raise KeyError(index)
+        if index >= len(self.__alive):
+            self.__alive.extend(bytes(index + 1 - len(self.__alive)))
+        if not self.__alive[index]:
+            self.__live.insert(bisect_left(self.__live, index), index)
+            self.__alive[index] = 1
+        self.__stored[index] = row
+        self.version += 1
+
+    def __delitem__(self, index: int) -> None:
+        """
+        Delete the row at `index`, leaving a hole.
+
+        Raises:
+            KeyError: If there is no row at `index`.
+        """
+        if index not in self:
+            raise KeyError(index)
+        self.__alive[index] = 0
+        del self.__live[bisect_left(self.__live, index)]
+        self.__stored.pop(index, None)
+        self.version += 1
+
+    def __contains__(self, index: object) -> bool:
+        """Check whether there is a row at `index`"""
+        return (isinstance(index, int) and 0 <= index < len(self.__alive)
+                and self.__alive[index] == 1)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the positions of the live rows, in order"""
+        return iter(self.__live.tolist())
+
+    def __len__(self) -> int:
+        """Return the number of live rows"""
+        return len(self.__live)
+
+    def get(self, index: int, default: Optional[List] = None):
+        """Return the row at `index`, or `default` if there is none"""
+        return self[index] if index in self else default
+
+    def append(self, row: List) -> int:
+        """Store `row` after every other one, return its position"""
+        index = len(self.__alive)
+        self[index] = row
+        return index
+
+    def next_live(self, index: int, count: int) -> List[int]:
+        """
+        Return the positions of the next live rows.
+
+        Args:
+            index (int): The position to start from, included.
+            count (int): The maximum number of positions to return.
+
+        Returns:
+            List[int]: Up to `count` positions, in increasing order.
+        """
+        start = bisect_left(self.__live, index)
+        return self.__live[start:start + count].tolist()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""Keyset (cursor) pagination over the baby names dataset"""
+
+import base64
+import binascii
+import json
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+FIELDS = {
+    "year": (0, int),
+    "gender": (1, str),
+    "ethnicity": (2, str),
+    "name": (3, str),
+    "count": (4, int),
+    "rank": (5, int),
+}
+FILTERS = ("year", "gender", "ethnicity", "name")
+
+
+def parse_sort(sort: str) -> Tuple[Tuple[int, type, bool], ...]:
+    """
+    Parse a sort specification such as "-count,rank,name".
+
+    Args:
+        sort (str): Comma-separated keys of `FIELDS`, each prefixed with
+            "-" for a descending order.
+
+    Returns:
+        Tuple: One `(column, type, descending)` triple per field.
+
+    Raises:
+        ValueError: If a field is unknown.
+    """
+    fields = []
+    for name in sort.split(","):
+        name = name.strip()
+        descending = name.startswith("-")
+        name = name.lstrip("-")
+        if name not in FIELDS:
+            raise ValueError("unknown sort field: {!r}".format(name))
+        column, kind = FIELDS[name]
+        fields.append((column, kind, descending))
+    return tuple(fields)
+
+
+def _descending(text: str) -> Tuple[int, ...]:
+    """Return a key ordering strings in reverse, prefixes last"""
+    return tuple(-ord(c) for c in text) + (1,)
+
+
+def sort_key(values: Sequence[str], fields: Tuple, position: int) -> Tuple:
+    """
+    Return the key of a row in the order given by `fields`.
+
+    Args:
+        values (Sequence[str]): The row, or the values of its sort fields
+            in the order of `fields`.
+        fields (Tuple): The result of `parse_sort`.
+        position (int): The row position, which breaks ties.
+
+    Returns:
+        Tuple: A key comparing like the rows should be ordered.
+    """
+    key = []
+    for value, (column, kind, descending) in zip(values, fields):
+        if kind is int:
+            value = int(value)
+            key.append(-value if descending else value)
+        else:
+            key.append(_descending(value) if descending else value)
+    key.append(position)
+    return tuple(key)
+
+
+def encode_cursor(state: List) -> str:
+    """Encode pagination state as an opaque URL-safe string"""
+    data = json.dumps(state, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> List:
+    """
+    Decode a cursor made by `encode_cursor`.
+
+    Returns:
+        List: The `[sort, filters, values, position]` of the cursor: the
+            sort specification, the filters as a dictionary of strings,
+            one value per sort field and a non-negative row position.
+
+    Raises:
+        ValueError: If `cursor` is malformed.
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(data)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError("malformed cursor: {!r}".format(cursor))
+    if not isinstance(state, list) or len(state) != 4:
+        raise ValueError("malformed cursor: {!r}".format(cursor))
+    sort, filters, values, position = state
+    if (not isinstance(sort, str) or not isinstance(filters, dict) or
+            not all(isinstance(name, str) and isinstance(value, str)
+                    for name, value in filters.items()) or
+            not isinstance(values, list) or
+            not all(isinstance(value, str) for value in values) or
+            not isinstance(position, int) or isinstance(position, bool) or
+            position < 0):
+        raise ValueError("malformed cursor: {!r}".format(cursor))
+    try:
+        fields = parse_sort(sort)
+    except ValueError:
+        raise ValueError("malformed cursor: {!r}".format(cursor))
+    if len(values) != len(fields):
+        raise ValueError("malformed cursor: {!r}".format(cursor))
+    return state
+
+
+class KeysetIndex:
+    """Sorted and inverted indexes answering keyset page queries
+
+    For each sort specification, the row positions are sorted once; for
+    each filter column, the positions of every value are listed once.
+    A filtered order is the matching positions kept in the sorted order,
+    computed once per combination of sort and filters and then reused
+    (the latest `MAX_ORDERS` combinations are kept).
+
+    A page starts after the last row of the previous one, found by
+    binary search on its sort key, so deep pages cost as much as the
+    first one.
+    """
+    MAX_ORDERS = 256
+
+    def __init__(self, dataset: Sequence):
+        """
+        Initialize empty indexes over `dataset`, built on demand.
+
+        Args:
+            dataset (Sequence): The rows, which must not change.
+        """
+        self.dataset = dataset
+        self.__sorted = {}
+        self.__ranks = {}
+        self.__postings = {}
+        self.__orders = {}
+
+    def postings(self, name: str) -> Dict[str, array]:
+        """Return the sorted positions of each value of a filter column"""
+        postings = self.__postings.get(name)
+        if postings is None:
+            column = FIELDS[name][0]
+            postings = {}
+            for position, row in enumerate(self.dataset):
+                postings.setdefault(row[column], array("l")).append(position)
+            self.__postings[name] = postings
+        return postings
+
+    def order(self, sort: str, filters: Dict[str, str]) -> array:
+        """
+        Return the positions of the matching rows, in sorted order.
+
+        Args:
+            sort (str): The sort specification, see `parse_sort`.
+            filters (Dict[str, str]): Required values of `FILTERS`
+                columns.
+
+        Raises:
+            ValueError: If a sort or filter field is unknown.
+        """
+        key = (sort, tuple(sorted(filters.items())))
+        order = self.__orders.pop(key, None)
+        if order is None:
+            order = self._filter(sort, filters)
+            if len(self.__orders) >= self.MAX_ORDERS:
+                del self.__orders[next(iter(self.__orders))]
+        self.__orders[key] = order
+        return order
+
+    def page(self, sort: str, filters: Dict[str, str],
+             after: Optional[List] = None,
+             page_size: int = 10) -> Tuple[List[List], Optional[List], int]:
+        """
+        Return the rows of a page.
+
+        Args:
+            sort (str): The sort specification, see `parse_sort`.
+            filters (Dict[str, str]): Required values of filter columns.
+            after (List): The `[values, position]` of the last row of
+                the previous page, None for the first page.
+            page_size (int): The maximum number of rows.
+
+        Returns:
+            Tuple: The rows, the `[values, position]` of the last one if
+                more rows follow (None otherwise), and the total number
+                of matching rows.
+        """
+        fields = parse_sort(sort)
+        order = self.order(sort, filters)
+        start = 0
+        if after is not None:
+            key = sort_key(after[0], fields, after[1])
+            start = self._bisect(order, fields, key)
+        positions = order[start:start + page_size]
+        rows = [self.dataset[position] for position in positions]
+        last = None
+        if rows and start + page_size < len(order):
+            last = [[rows[-1][column] for column, _, _ in fields],
+                    positions[-1]]
+        return rows, last, len(order)
+
+    def _sorted(self, sort: str) -> Tuple[array, array]:
+        """Return every position in sorted order, and their ranks in it"""
+        if sort not in self.__sorted:
+            fields = parse_sort(sort)
+            dataset = self.dataset
+            columns = [column for column, _, _ in fields]
+            order = array("l", sorted(
+                range(len(dataset)),
+                key=lambda p: sort_key([dataset[p][c] for c in columns],
+                                       fields, p)))
+            ranks = array("l", bytes(order.itemsize * len(order)))
+            for rank, position in enumerate(order):
+                ranks[position] = rank
+            self.__sorted[sort] = order
+            self.__ranks[sort] = ranks
+        return self.__sorted[sort], self.__ranks[sort]
+
+    def _filter(self, sort: str, filters: Dict[str, str]) -> array:
+        """Compute the sorted positions of the rows matching `filters`"""
+        for name in filters:
+            if name not in FILTERS:
+                raise ValueError("unknown filter: {!r}".format(name))
+        order, ranks = self._sorted(sort)
+        if not filters:
+            return order
+        empty = array("l")
+        lists = sorted((self.postings(name).get(str(value), empty)
+                        for name, value in filters.items()), key=len)
+        matches = lists[0]
+        if len(lists) > 1:
+            others = [set(positions) for positions in lists[1:]]
+            matches = [p for p in matches if all(p in s for s in others)]
+        return array("l", sorted(matches, key=ranks.__getitem__))
+
+    def _bisect(self, order: array, fields: Tuple, key: Tuple) -> int:
+        """Return how many positions of `order` sort at or before `key`"""
+        columns = [column for column, _, _ in fields]
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            position = order[middle]
+            row = self.dataset[position]
+            if sort_key([row[c] for c in columns], fields, position) <= key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""Read-ahead of sequential pages for the pagination servers"""
+
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from response_cache import LRUCache
+
+
+class Prefetcher:
+    """Computes the next pages of sequential readers ahead of time
+
+    A response tells which request comes next (its `next_page` or
+    `next_index`); a request that is the next one of an earlier
+    response is taken as sequential. After answering it, the
+    `depth` following pages are computed on a background thread into a
+    buffer of one of the `0x01-caching` policies, bounded to `max_items`
+    pages, so the follow-up request finds its page ready, or waits for
+    the computation already running rather than start another.
+
+    Like `ResponseCache`, buffered pages are keyed by the dataset
+    version they were computed from and dropped when it changes.
+    Buffered responses are shared by every caller and must not be
+    modified.
+    """
+    def __init__(self, depth: int = 2, max_items: int = 256,
+                 policy: type = LRUCache, **kwargs: Any):
+        """
+        Initialize an empty buffer and its worker thread.
+
+        Args:
+            depth (int): The number of pages read ahead. Defaults to 2.
+            max_items (int): The maximum number of pages buffered, and
+                of pages expected next.
+            policy (type): The `BaseCaching` subclass buffering pages.
+                Defaults to `LRUCache`.
+            **kwargs: Other options of the buffer (see `BaseCaching`).
+        """
+        kwargs['thread_safe'] = True
+        self.depth = depth
+        self.max_items = max_items
+        self.buffer = policy(max_items=max_items, **kwargs)
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self.closed = False
+        self.__expected = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__worker = ThreadPoolExecutor(1, "prefetch")
+
+    def fetch(self, key: Hashable, version: Hashable,
+              compute: Callable[..., Any], request: Dict[str, Any],
+              follow: Callable[[Any], Optional[Dict[str, Any]]]) -> Any:
+        """
+        Return the response to `request`, then read ahead if sequential.
+
+        Args:
+            key (Hashable): Identifies the method.
+            version (Hashable): The current version of the dataset.
+            compute (Callable): Computes a response, called with the
+                arguments of a request.
+            request (Dict[str, Any]): The arguments of the request.
+            follow (Callable): Returns the arguments of the request
+                following a response, or None after the last page.
+        """
+        with self.__lock:
+            if version != self.version:
+                self.buffer.clear()
+                self.__expected.clear()
+                self.version = version
+            sequential = self.__expected.pop(
+                self._key(key, request), None) is not None
+        future = self.buffer.get((version, self._key(key, request)))
+        response = None
+        if future is not None:
+            try:
+                response = future.result()
+            except Exception:
+                future = None
+        if future is None:
+            response = compute(**request)
+        with self.__lock:
+            if future is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            following = follow(response)
+            if following is not None:
+                self.__expected[self._key(key, following)] = True
+                while len(self.__expected) > self.max_items:
+                    self.__expected.popitem(last=False)
+        if sequential and following is not None:
+            self._read_ahead(key, version, compute, following, follow)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the counters of the read-ahead.
+
+        Returns:
+            Dict[str, Any]: The number of requests served from the
+                buffer (`hits`) and computed on demand (`misses`), the
+                `hit_ratio`, the number of pages `prefetched`, of pages
+                `evicted` from the buffer, and the `depth`.
+        """
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / requests if requests else 0.0,
+            "prefetched": self.prefetched,
+            "evicted": self.buffer.stats()["evictions"],
+            "depth": self.depth,
+        }
+
+    def close(self) -> None:
+        """Stop reading ahead, and the worker thread once the pending pages
+        are computed; requests are then all computed on demand"""
+        with self.__lock:
+            self.closed = True
+        self.__worker.shutdown()
+
+    @staticmethod
+    def _key(key: Hashable, request: Dict[str, Any]) -> Hashable:
+        """Return the buffer key of a request"""
+        return key, tuple(sorted(request.items()))
+
+    def _read_ahead(self, key: Hashable, version: Hashable,
+                    compute: Callable[..., Any], request: Dict[str, Any],
+                    follow: Callable[[Any], Optional[Dict[str, Any]]],
+                    depth: Optional[int] = None) -> None:
+        """Buffer the page of `request` and the ones after it"""
+        if depth is None:
+            depth = self.depth
+        if depth <= 0:
+            return
+        buffer_key = (version, self._key(key, request))
+        with self.__lock:
+            if self.closed or version != self.version:
+                return
+            future = self.buffer.get(buffer_key)
+            if future is None:
+                future = Future()
+                try:
+                    self.__worker.submit(self._compute, future, compute,
+                                         request)
+                except RuntimeError:
+                    return
+                self.buffer.put(buffer_key, future)
+                self.prefetched += 1
+        future.add_done_callback(functools.partial(
+            self._chain, key, version, compute, follow, depth - 1))
+
+    def _chain(self, key: Hashable, version: Hashable,
+               compute: Callable[..., Any],
+               follow: Callable[[Any], Optional[Dict[str, Any]]],
+               depth: int, future: Future) -> None:
+        """Read ahead after the page computed by `future`"""
+        if depth > 0 and not self.closed and future.exception() is None:
+            following = follow(future.result())
+            if following is not None:
+                self._read_ahead(key, version, compute, following, follow,
+                                 depth)
+
+    @staticmethod
+    def _compute(future: Future, compute: Callable[..., Any],
+                 request: Dict[str, Any]) -> None:
+        """Compute a page into `future`"""
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(compute(**request))
+            except Exception as error:
+                future.set_exception(error)
+
+
+def follow_page(response: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return the request following a `get_hyper` response"""
+    if response["next_page"] is None:
+        return None
+    return {"page": response["next_page"],
+            "page_size": response["page_size"]}
+
+
+def follow_index(response: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return the request following a `get_hyper_index` response"""
+    if response["next_index"] is None:
+        return None
+    return {"index": response["next_index"],
+            "page_size": response["page_size"]}
+
+
+def prefetched(follow: Callable[[Any], Optional[Dict[str, Any]]]) -> Callable:
+    """
+    Serve a server method through the server's `prefetcher`, if any.
+
+    Args:
+        follow (Callable): Returns the arguments of the request following
+            a response of the method, or None after the last page.
+
+    The arguments are bound to the parameters of the method, so
+    `get_hyper(2)` and `get_hyper(page=2)` are the same request. The
+    dataset version is the one returned by the server's
+    `dataset_version` method, or 0 if it has none.
+    """
+    def decorator(method: Callable) -> Callable:
+        """Wrap `method`"""
+        signature = inspect.signature(method)
+        name = method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            """Return the buffered response, computing it if missing"""
+            prefetcher = getattr(self, "prefetcher", None)
+            if prefetcher is None:
+                return method(self, *args, **kwargs)
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            request = dict(bound.arguments)
+            del request["self"]
+            version_of = getattr(self, "dataset_version", None)
+            version = version_of() if version_of is not None else 0
+            return prefetcher.fetch(
+                name, version, functools.partial(method, self), request,
+                follow)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Response caching for the pagination servers"""
+
+import functools
+import os
+import sys
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+CACHING_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           os.pardir, "0x01-caching")
+if CACHING_DIR not in sys.path:
+    sys.path.append(CACHING_DIR)
+
+LRUCache = __import__('3-lru_cache').LRUCache
+
+
+class ResponseCache:
+    """Cache of server responses, emptied when the dataset changes
+
+    Responses are stored in a thread-safe cache of one of the
+    `0x01-caching` policies, keyed by the method name and arguments and
+    by the dataset version the response was computed from. A response
+    of an older version is never returned: the first lookup seeing a
+    new version empties the cache.
+
+    Cached responses are shared by every caller and must not be
+    modified.
+    """
+    def __init__(self, policy: type = LRUCache, max_items: int = 1024,
+                 **kwargs: Any):
+        """
+        Initialize an empty cache.
+
+        Args:
+            policy (type): The `BaseCaching` subclass storing responses.
+                Defaults to `LRUCache`.
+            max_items (int): The maximum number of responses kept.
+            **kwargs: Other options of the cache (see `BaseCaching`).
+        """
+        kwargs['thread_safe'] = True
+        self.cache = policy(max_items=max_items, **kwargs)
+        self.version = None
+        self.invalidations = 0
+        self.__lock = threading.Lock()
+
+    def fetch(self, key: Hashable, version: Hashable,
+              compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached response of `key`, computing it if missing.
+
+        Args:
+            key (Hashable): Identifies the request.
+            version (Hashable): The current version of the dataset.
+            compute (Callable): Computes the response.
+        """
+        if version != self.version:
+            with self.__lock:
+                if version != self.version:
+                    if self.version is not None:
+                        self.invalidations += 1
+                    self.cache.clear()
+                    self.version = version
+        key = (version, key)
+        hit = self.cache.get(key)
+        if hit is not None:
+            return hit[0]
+        response = compute()
+        self.cache.put(key, (response,))
+        return response
+
+    def invalidate(self) -> None:
+        """Drop every cached response"""
+        with self.__lock:
+            self.invalidations += 1
+            self.cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the counters of the cache.
+
+        Returns:
+            Dict[str, Any]: The counters of `BaseCaching.stats`, among
+                which `hits`, `misses` and `hit_ratio`, along with the
+                number of `invalidations`.
+        """
+        stats = self.cache.stats()
+        stats["invalidations"] = self.invalidations
+        return stats
+
+
+def cached_response(method: Callable) -> Callable:
+    """
+    Serve a server method from the server's `response_cache`, if any.
+
+    The cache key is the method name with its arguments as passed, so
+    `get_page(2)` and `get_page(page=2)` are cached separately. The
+    dataset version is the one returned by the server's
+    `dataset_version` method, or 0 if it has none.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        """Return the cached response, computing it if missing"""
+        cache = self.response_cache
+        if cache is None:
+            return method(self, *args, **kwargs)
+        version_of = getattr(self, "dataset_version", None)
+        version = version_of() if version_of is not None else 0
+        key = (name, args, tuple(sorted(kwargs.items())))
+        return cache.fetch(key, version,
+                           lambda: method(self, *args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Tests of the dataset backends"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+
+from datasets import BACKENDS, ColumnarDataset, load_dataset  # noqa: E402
+
+
+class TestEmptyFile(unittest.TestCase):
+    """An empty CSV file loads as an empty dataset"""
+
+    def setUp(self):
+        """Create an empty CSV file"""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "empty.csv")
+        open(self.path, "w").close()
+
+    def tearDown(self):
+        """Remove the file and its sidecars"""
+        shutil.rmtree(self.directory)
+
+    def test_from_csv(self):
+        """A columnar dataset without a header has no rows"""
+        dataset = ColumnarDataset.from_csv(self.path)
+        self.assertEqual(len(dataset), 0)
+        self.assertEqual(dataset.header, [])
+
+    def test_every_backend(self):
+        """Every backend loads the file as no rows, twice"""
+        for backend in sorted(BACKENDS):
+            for _ in range(2):
+                dataset = load_dataset(self.path, backend)
+                self.assertEqual(len(dataset), 0, backend)
+                self.assertEqual(list(dataset[0:10]), [], backend)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Tests of the keyset cursors"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+
+from keyset import decode_cursor, encode_cursor  # noqa: E402
+
+
+class TestDecodeCursor(unittest.TestCase):
+    """Malformed cursors raise ValueError"""
+
+    def test_round_trip(self):
+        """A cursor made by `encode_cursor` decodes to its state"""
+        state = ["-count,name", {"year": "2011"}, ["100", "Emma"], 42]
+        self.assertEqual(decode_cursor(encode_cursor(state)), state)
+
+    def test_not_base64_json(self):
+        """Garbage is rejected"""
+        for cursor in ("!!!", "bm90IGpzb24", encode_cursor({"a": 1})):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+    def test_wrong_shape(self):
+        """Valid JSON of the wrong shape is rejected"""
+        self.assertEqual(encode_cursor([1, 2, 3, 4]), "WzEsMiwzLDRd")
+        states = [
+            [1, 2, 3, 4],
+            ["name", [], ["Emma"], 0],
+            ["name", {"year": 2011}, ["Emma"], 0],
+            ["name", {}, "Emma", 0],
+            ["name", {}, [1], 0],
+            ["name", {}, ["Emma"], -1],
+            ["name", {}, ["Emma"], "0"],
+            ["name", {}, ["Emma"], True],
+            ["name", {}, ["Emma"], 1.5],
+            ["name", {}, [], 0],
+            ["count,name", {}, ["Emma"], 0],
+            ["unknown", {}, ["Emma"], 0],
+        ]
+        for state in states:
+            with self.assertRaises(ValueError, msg=state):
+                decode_cursor(encode_cursor(state))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Tests of the sequential read-ahead"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+
+from prefetch import Prefetcher, follow_page  # noqa: E402
+
+LAST_PAGE = 10
+
+
+class Pages:
+    """Computes fake `get_hyper` responses, counting the calls"""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, page: int, page_size: int) -> dict:
+        """Return the response of `page`"""
+        with self.lock:
+            self.calls.append(page)
+        return {"page": page, "page_size": page_size,
+                "next_page": page + 1 if page < LAST_PAGE else None}
+
+
+def fetch(prefetcher: Prefetcher, compute, page: int,
+          version: int = 0) -> dict:
+    """Request `page` through `prefetcher`, failing rather than hang"""
+    result = {}
+
+    def run():
+        """Fetch the page into `result`"""
+        result["response"] = prefetcher.fetch(
+            "get_hyper", version, compute, {"page": page, "page_size": 1},
+            follow_page)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(5)
+    if thread.is_alive():
+        raise AssertionError("fetch of page {} hangs".format(page))
+    return result["response"]
+
+
+class TestPrefetcher(unittest.TestCase):
+    """Sequential readers are served from the buffer"""
+
+    def setUp(self):
+        """Create a prefetcher reading two pages ahead"""
+        self.pages = Pages()
+        self.prefetcher = Prefetcher(depth=2)
+
+    def tearDown(self):
+        """Stop the worker thread"""
+        self.prefetcher.close()
+
+    def test_sequential_reads_hit(self):
+        """Pages after the second sequential one come from the buffer"""
+        for page in range(1, 6):
+            self.assertEqual(
+                fetch(self.prefetcher, self.pages, page)["page"], page)
+        stats = self.prefetcher.stats()
+        self.assertEqual((stats["misses"], stats["hits"]), (2, 3))
+        self.prefetcher.close()
+        calls = self.pages.calls
+        self.assertEqual(len(calls), len(set(calls)))
+        self.assertLessEqual({1, 2, 3, 4, 5}, set(calls))
+
+    def test_random_reads_do_not_read_ahead(self):
+        """Reads that do not follow each other are all computed"""
+        for page in (5, 1, 8, 3):
+            fetch(self.prefetcher, self.pages, page)
+        self.assertEqual(self.prefetcher.stats()["prefetched"], 0)
+        self.assertEqual(self.pages.calls, [5, 1, 8, 3])
+
+    def test_version_change_drops_buffer(self):
+        """Pages read ahead for an older version are not served"""
+        fetch(self.prefetcher, self.pages, 1)
+        fetch(self.prefetcher, self.pages, 2)
+        fetch(self.prefetcher, self.pages, 3)
+        self.assertEqual(self.prefetcher.stats()["hits"], 1)
+        fetch(self.prefetcher, self.pages, 4, version=1)
+        self.assertEqual(self.prefetcher.stats()["hits"], 1)
+        self.assertEqual(self.prefetcher.stats()["misses"], 3)
+        self.assertEqual(self.prefetcher.version, 1)
+        self.assertEqual(len(self.prefetcher.buffer), 0)
+
+    def test_failed_read_ahead_falls_back_to_compute(self):
+        """A page whose read-ahead failed is computed on demand"""
+        def compute(page: int, page_size: int) -> dict:
+            """Fail the read-ahead of page 3"""
+            if page == 3 and threading.current_thread().name.startswith(
+                    "prefetch"):
+                raise OSError("read-ahead failed")
+            return self.pages(page, page_size)
+
+        fetch(self.prefetcher, compute, 1)
+        fetch(self.prefetcher, compute, 2)
+        self.assertEqual(fetch(self.prefetcher, compute, 3)["page"], 3)
+        stats = self.prefetcher.stats()
+        self.assertEqual((stats["misses"], stats["hits"]), (3, 0))
+        self.assertEqual(self.pages.calls[:3], [1, 2, 3])
+
+
+class TestPrefetcherClose(unittest.TestCase):
+    """Closing the prefetcher stops the read-ahead cleanly"""
+
+    def test_close_during_chain(self):
+        """A chain running when the prefetcher closes leaves no page
+        pending in the buffer"""
+        started = threading.Event()
+        release = threading.Event()
+        pages = Pages()
+
+        def compute(page: int, page_size: int) -> dict:
+            """Block the read-ahead of page 3"""
+            if page == 3 and threading.current_thread().name.startswith(
+                    "prefetch"):
+                started.set()
+                release.wait(5)
+            return pages(page, page_size)
+
+        prefetcher = Prefetcher(depth=2)
+        fetch(prefetcher, compute, 1)
+        fetch(prefetcher, compute, 2)
+        self.assertTrue(started.wait(5))
+        closing = threading.Thread(target=prefetcher.close)
+        closing.start()
+        while not prefetcher.closed:
+            time.sleep(0.001)
+        release.set()
+        closing.join(5)
+        self.assertFalse(closing.is_alive())
+        self.assertEqual(fetch(prefetcher, compute, 3)["page"], 3)
+        self.assertEqual(fetch(prefetcher, compute, 4)["page"], 4)
+        self.assertEqual(fetch(prefetcher, compute, 5)["page"], 5)
+        self.assertEqual(prefetcher.stats()["prefetched"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,38 +5,54 @@ BaseCaching = __import__('base_caching').BaseCaching
 
 
 class BasicCache(BaseCaching):
-    """Class that inherits from BaseCaching and is a Basic caching system"""
-    def __init__(self):
+    """Class that inherits from BaseCaching and is a Basic caching system
+
+    The cache has no eviction policy, so it has no entry limit by
+    default. Given a `max_items` or `max_bytes` budget, it refuses the
+    items that do not fit instead of evicting older ones: expired
+    entries are still reclaimed, but live entries are never dropped to
+    make room.
+    """
+    MAX_ITEMS = None
+
+    def __init__(self, **kwargs):
         """Initializes the BasicCache instance.
             Calls the parent class's constructor to initialize
-            the `cache_data` dictionary.
-        """
-        super().__init__()
-
-    def put(self, key, item):
+            the `cache_data` dictionary and the options given in `kwargs`
+            (see `BaseCaching`).
         """
-        Stores an item in the cache.
+        super().__init__(**kwargs)
 
-        Args:
-            key (str): The key to identify the item.
-            item (any): The item to be stored.
+    def put(self, key, item, ttl=None):
+        """Adds an item in the cache, unless it does not fit the budgets
 
-        If both `key` and `item` are provided,
-        the item is added to the cache dictionary.
+        A refused item drops any older value stored under `key`, like an
+        item larger than `max_bytes` does in `BaseCaching.put`.
         """
         if key and item:
-            self.cache_data[key] = item
-
-    def get(self, key):
+            size = self.sizer(item) if self.key_sizes is not None else 0
+            with self.lock:
+                if not self._fits(key, size):
+                    self.puts += 1
+                    if key in self.cache_data:
+                        self._remove(key)
+                    return
+                super().put(key, item, ttl)
+
+    def put_many(self, items, ttl=None):
+        """Adds several items in the cache, one at a time, refusing the
+        ones that do not fit the budgets
         """
-        Retrieves an item from the cache.
-
-        Args:
-            key (str): The key of the item to retrieve.
-
-        Returns:
-            The value associated with the key if found, otherwise None.
+        if hasattr(items, 'items'):
+            items = items.items()
+        with self.lock:
+            for key, item in items:
+                self.put(key, item, ttl)
+
+    def _fits(self, key, size):
+        """Checks whether `size` bytes fit under `key` without evicting
+        any live entry
         """
-        if key and key in self.cache_data:
-            return self.cache_data[key]
-        return None
+        if self._deadlines and self._over_budget(key, size):
+            self.sweep()
+        return not self._over_budget(key, size)
@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+""" ARC caching """
+
+BaseCaching = __import__('base_caching').BaseCaching
+KeyOrder = __import__('key_order').KeyOrder
+
+
+class ARCCache(BaseCaching):
+    """Class that inherits from BaseCaching and is an Adaptive Replacement
+    Cache (ARC)
+
+    Cached keys are split between `t1` (seen once recently) and `t2`
+    (seen at least twice), both in LRU order. Keys evicted from them are
+    remembered, without their items, in the ghost lists `b1` and `b2`.
+    A miss on a ghost key moves the target size `p` of `t1` towards the
+    list that would have kept it, so the cache adapts between recency
+    and frequency, and a one-off scan can only flush `t1`.
+    """
+    POLICY_STATE = ('t1', 't2', 'b1', 'b2', 'p')
+
+    def __init__(self, **kwargs):
+        """Initializes the ARCCache instance.
+
+        - Calls the parent class's constructor to initialize the
+          `cache_data` dictionary and the options given in `kwargs` (see
+          `BaseCaching`). ARC sizes its lists in entries, so `max_items`
+          must be set (it defaults to `MAX_ITEMS`).
+        - Initializes the `KeyOrder` indexes `t1`, `t2`, `b1` and `b2`
+          and the adaptive target `p`.
+        """
+        super().__init__(**kwargs)
+        if self.max_items is None:
+            raise ValueError("ARCCache needs max_items")
+        self.t1 = KeyOrder()
+        self.t2 = KeyOrder()
+        self.b1 = KeyOrder()
+        self.b2 = KeyOrder()
+        self.p = 0
+        self._incoming = None
+
+    def _prepare(self, key):
+        """Adapts the target size `p` of `t1` to a key about to be added.
+
+        -   If `key` is a ghost in `b1`, `p` grows; if it is a ghost in
+            `b2`, `p` shrinks. The key is then admitted straight into `t2`.
+        -   The key is remembered until it is admitted, as the choice of
+            the victim depends on it.
+        """
+        capacity = self.max_items
+        if key in self.b1:
+            delta = max(len(self.b2) // len(self.b1), 1)
+            self.p = min(self.p + delta, capacity)
+        elif key in self.b2:
+            delta = max(len(self.b1) // len(self.b2), 1)
+            self.p = max(self.p - delta, 0)
+        self._incoming = key
+
+    def _admit(self, key):
+        """Adds a new key to `t1`, or to `t2` after a ghost hit.
+
+        The ghost lists are then trimmed so that `t1` and `b1` hold at
+        most `max_items` keys together, and all four lists twice that.
+        """
+        if key in self.b1 or key in self.b2:
+            self.b1.discard(key)
+            self.b2.discard(key)
+            self.t2.push(key)
+        else:
+            self.t1.push(key)
+        self._incoming = None
+        capacity = self.max_items
+        if len(self.t1) + len(self.b1) > capacity and self.b1:
+            self.b1.pop_oldest()
+        total = len(self.t1) + len(self.t2) + len(self.b1) + len(self.b2)
+        if total > 2 * capacity and self.b2:
+            self.b2.pop_oldest()
+
+    def _refresh(self, key):
+        """Promotes an updated key to the most recent end of `t2`"""
+        self._touch(key)
+
+    def _touch(self, key):
+        """Promotes a read key to the most recent end of `t2`"""
+        if key in self.t1:
+            self.t1.discard(key)
+            self.t2.push(key)
+        else:
+            self.t2.touch(key)
+
+    def _forget(self, key):
+        """Removes a key from the cached lists without remembering it"""
+        self.t1.discard(key)
+        self.t2.discard(key)
+
+    def _victim(self):
+        """Picks the item to evict and remembers its key as a ghost.
+
+        The LRU key of `t1` is picked while `t1` is over its target size
+        `p`, otherwise the LRU key of `t2`.
+        """
+        size = len(self.t1)
+        if self.t1 and (size > self.p or not self.t2 or
+                        (size == self.p and self._incoming in self.b2)):
+            key = self.t1.pop_oldest()
+            self.b1.push(key)
+        else:
+            key = self.t2.pop_oldest()
+            self.b2.push(key)
+        return key
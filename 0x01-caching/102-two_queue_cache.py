@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+""" 2Q caching """
+
+BaseCaching = __import__('base_caching').BaseCaching
+KeyOrder = __import__('key_order').KeyOrder
+
+
+class TwoQueueCache(BaseCaching):
+    """Class that inherits from BaseCaching and is a 2Q caching system
+
+    New keys enter the FIFO queue `a1in`. Keys evicted from it are
+    remembered, without their items, in the ghost queue `a1out`; only a
+    key seen again while in `a1out` is admitted to the LRU queue `am`.
+    Keys read only once, such as those of a sequential scan, therefore
+    never push the hot keys out of `am`.
+    """
+    IN_RATIO = 0.25
+    OUT_RATIO = 0.5
+    POLICY_STATE = ('a1in', 'a1out', 'am')
+
+    def __init__(self, **kwargs):
+        """Initializes the TwoQueueCache instance.
+
+        - Calls the parent class's constructor to initialize the
+          `cache_data` dictionary and the options given in `kwargs` (see
+          `BaseCaching`). 2Q sizes its queues in entries, so `max_items`
+          must be set (it defaults to `MAX_ITEMS`).
+        - Initializes the `KeyOrder` indexes `a1in`, `a1out` and `am`,
+          with `a1in` kept to `IN_RATIO` and `a1out` to `OUT_RATIO` of
+          `max_items`.
+        """
+        super().__init__(**kwargs)
+        if self.max_items is None:
+            raise ValueError("TwoQueueCache needs max_items")
+        self.in_size = max(1, int(self.max_items * self.IN_RATIO))
+        self.out_size = max(1, int(self.max_items * self.OUT_RATIO))
+        self.a1in = KeyOrder()
+        self.a1out = KeyOrder()
+        self.am = KeyOrder()
+
+    def _admit(self, key):
+        """Adds a new key to `am` if it is a ghost of `a1out`, else to `a1in`
+        """
+        if key in self.a1out:
+            self.a1out.discard(key)
+            self.am.push(key)
+        else:
+            self.a1in.push(key)
+
+    def _refresh(self, key):
+        """Marks an updated key of `am` as the most recently used one"""
+        self._touch(key)
+
+    def _touch(self, key):
+        """Marks a read key of `am` as the most recently used one.
+
+        Keys of `a1in` keep their FIFO position.
+        """
+        if key in self.am:
+            self.am.touch(key)
+
+    def _forget(self, key):
+        """Removes a key from the queues without remembering it"""
+        self.a1in.discard(key)
+        self.am.discard(key)
+
+    def _victim(self):
+        """Picks the item to evict.
+
+        The oldest key of `a1in` is picked, and remembered in `a1out`,
+        while `a1in` is over its size; otherwise the LRU key of `am` is.
+        """
+        if self.a1in and (len(self.a1in) > self.in_size or not self.am):
+            key = self.a1in.pop_oldest()
+            self.a1out.push(key)
+            if len(self.a1out) > self.out_size:
+                self.a1out.pop_oldest()
+            return key
+        return self.am.pop_oldest()
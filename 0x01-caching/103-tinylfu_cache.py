@@ -0,0 +1,155 @@
+#!/usr/bin/python3
+""" W-TinyLFU caching """
+import hashlib
+
+BaseCaching = __import__('base_caching').BaseCaching
+KeyOrder = __import__('key_order').KeyOrder
+
+
+class CountMinSketch():
+    """Approximate access counter with a fixed memory footprint
+
+    Each key is counted in one byte-sized cell of every row; its estimate
+    is the smallest of those cells. Cells saturate at 15 and every count
+    is halved once `sample_size` increments were recorded, so the sketch
+    favours recent popularity.
+
+    Keys are hashed from their `repr` rather than with `hash`, which is
+    salted per process for strings and bytes, so a sketch saved in a
+    snapshot counts the same keys once loaded in another process.
+    """
+    SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F,
+             0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+    MAX_COUNT = 15
+
+    def __init__(self, width, sample_size):
+        """Initializes a sketch of at least `width` cells per row"""
+        bits = max(4, (width - 1).bit_length())
+        self.shift = 64 - bits
+        self.rows = [bytearray(1 << bits) for _ in self.SEEDS]
+        self.sample_size = sample_size
+        self.additions = 0
+
+    def _cells(self, key):
+        """Yields the (row, index) pairs counting `key`"""
+        h = int.from_bytes(hashlib.blake2b(
+            repr(key).encode(), digest_size=8).digest(), 'little')
+        for row, seed in zip(self.rows, self.SEEDS):
+            yield row, ((h * seed) & 0xFFFFFFFFFFFFFFFF) >> self.shift
+
+    def increment(self, key):
+        """Records one access to `key`"""
+        for row, index in self._cells(key):
+            if row[index] < self.MAX_COUNT:
+                row[index] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.reset()
+
+    def estimate(self, key):
+        """Returns the approximate recent access count of `key`"""
+        return min(row[index] for row, index in self._cells(key))
+
+    def reset(self):
+        """Halves every count"""
+        for row in self.rows:
+            row[:] = bytes(count >> 1 for count in row)
+        self.additions //= 2
+
+
+class TinyLFUCache(BaseCaching):
+    """Class that inherits from BaseCaching and is a W-TinyLFU caching
+    system
+
+    New keys enter a small LRU `window`. When the cache is full, the
+    oldest window key competes with the next victim of the main cache, a
+    segmented LRU made of `probation` and `protected`: a `CountMinSketch`
+    of recent accesses decides which one is kept. Keys read once, such as
+    those of a sequential scan, lose against established ones and only
+    churn the window.
+    """
+    WINDOW_RATIO = 0.01
+    PROTECTED_RATIO = 0.8
+    POLICY_STATE = ('window', 'probation', 'protected', 'sketch')
+
+    def __init__(self, **kwargs):
+        """Initializes the TinyLFUCache instance.
+
+        - Calls the parent class's constructor to initialize the
+          `cache_data` dictionary and the options given in `kwargs` (see
+          `BaseCaching`). W-TinyLFU sizes its segments in entries, so
+          `max_items` must be set (it defaults to `MAX_ITEMS`).
+        - Splits `max_items` into the `window` (`WINDOW_RATIO`, at least
+          one entry) and the main cache, of which `PROTECTED_RATIO` may
+          be `protected`.
+        - Initializes the frequency `sketch`, sized after `max_items`.
+        """
+        super().__init__(**kwargs)
+        if self.max_items is None:
+            raise ValueError("TinyLFUCache needs max_items")
+        self.window_size = max(1, int(self.max_items * self.WINDOW_RATIO))
+        main_size = self.max_items - self.window_size
+        self.protected_size = int(main_size * self.PROTECTED_RATIO)
+        self.window = KeyOrder()
+        self.probation = KeyOrder()
+        self.protected = KeyOrder()
+        self.sketch = CountMinSketch(self.max_items, 10 * self.max_items)
+
+    def _observe(self, key):
+        """Records an access to `key` in the sketch"""
+        self.sketch.increment(key)
+
+    def _admit(self, key):
+        """Adds a new key to the window.
+
+        Keys overflowing the window move on to `probation`.
+        """
+        self.window.push(key)
+        while len(self.window) > self.window_size:
+            self.probation.push(self.window.pop_oldest())
+
+    def _refresh(self, key):
+        """Registers an update like a read"""
+        self._touch(key)
+
+    def _touch(self, key):
+        """Marks a read key as the most recently used one of its segment.
+
+        A key of `probation` is promoted to `protected`, whose LRU key is
+        demoted back to `probation` when `protected` is full.
+        """
+        if key in self.window:
+            self.window.touch(key)
+        elif key in self.probation:
+            self.probation.discard(key)
+            self.protected.push(key)
+            if len(self.protected) > self.protected_size:
+                self.probation.push(self.protected.pop_oldest())
+        else:
+            self.protected.touch(key)
+
+    def _forget(self, key):
+        """Removes a key from its segment"""
+        self.window.discard(key)
+        self.probation.discard(key)
+        self.protected.discard(key)
+
+    def _victim(self):
+        """Picks the item to evict.
+
+        The oldest window key is the candidate and the LRU key of the
+        main cache the victim; the one with the lower sketch estimate is
+        evicted, the candidate losing ties. A winning candidate moves to
+        `probation`.
+        """
+        main = self.probation if self.probation else self.protected
+        if not self.window:
+            return main.pop_oldest()
+        if not main:
+            return self.window.pop_oldest()
+        candidate = self.window.oldest()
+        victim = main.oldest()
+        if self.sketch.estimate(candidate) > self.sketch.estimate(victim):
+            self.probation.push(self.window.pop_oldest())
+            return main.pop_oldest()
+        return self.window.pop_oldest()
@@ -2,65 +2,42 @@
 """ LIFO caching """
 
 BaseCaching = __import__('base_caching').BaseCaching
+KeyOrder = __import__('key_order').KeyOrder
 
 
 class LIFOCache(BaseCaching):
-    """Class that inherits from BaseCaching and is a LIFO caching system"""
-    def __init__(self):
-        """Initializes the LIFOCache instance.
-            Calls the parent class's constructor to initialize
-            the `cache_data` dictionary.
-        """
-        super().__init__()
-        self.key_list = []
+    """Class that inherits from BaseCaching and is a LIFO caching system
 
-    def put(self, key, item):
-        """
-        Stores an item in the cache.
+    -   When the cache is over budget, the most recent item added to
+        the cache is removed (LIFO order).
 
-        Args:
-            key (str): The key to identify the item.
-            item (any): The item to be stored.
+    -   Storing an item under an existing key moves that key to the
+        newest position; reading it does not change the order.
+    """
+    POLICY_STATE = ('key_order',)
 
-        -   If both `key` and `item` are provided,
-            the item is added to the cache dictionary.
-
-        -   If adding a new item exceeds the cache limit defined in
-            `BaseCaching.MAX_ITEMS`, the most recent item added to
-            the cache is removed (LIFO order).
-
-        -   If the `key` already exists, it removes the key from
-            its current position in `key_list` before re-adding it
-            to the end, updating the cache's order for LIFO.
-        """
-        if key and item:
-            if len(self.cache_data) >= BaseCaching.MAX_ITEMS and \
-                                       key not in self.cache_data:
-                self.evict()
-            if key in self.cache_data:
-                self.key_list.remove(key)
-
-            self.key_list.append(key)
-
-            self.cache_data[key] = item
-
-    def get(self, key):
+    def __init__(self, **kwargs):
+        """Initializes the LIFOCache instance.
+            Calls the parent class's constructor to initialize
+            the `cache_data` dictionary and the options given in `kwargs`
+            (see `BaseCaching`), and initializes a
+            `KeyOrder` index `key_order` to keep track of insertion order.
         """
-        Retrieves an item from the cache.
+        super().__init__(**kwargs)
+        self.key_order = KeyOrder()
 
-        Args:
-            key (str): The key of the item to retrieve.
+    def _admit(self, key):
+        """Adds a new key at the newest position"""
+        self.key_order.push(key)
 
-        Returns:
-            The value associated with the key if found, otherwise None.
-        """
-        if key and key in self.cache_data:
-            return self.cache_data[key]
-        return None
+    def _refresh(self, key):
+        """Moves an updated key to the newest position"""
+        self.key_order.push(key)
 
-    def evict(self):
-        """Evicts the most recently added item from the cache."""
+    def _forget(self, key):
+        """Removes a key from the LIFO order"""
+        self.key_order.discard(key)
 
-        del_key = self.key_list.pop()
-        del self.cache_data[del_key]
-        print(f'DISCARD: {del_key}')
+    def _victim(self):
+        """Picks the most recently added item of the cache"""
+        return self.key_order.pop_newest()
@@ -2,71 +2,47 @@
 """ MRU caching """
 
 BaseCaching = __import__('base_caching').BaseCaching
+KeyOrder = __import__('key_order').KeyOrder
 
 
 class MRUCache(BaseCaching):
-    """Class that inherits from BaseCaching and is an MRU caching system"""
-    def __init__(self):
-        """Initializes the MRUCache instance.
-            Calls the parent class's constructor to initialize the
-            `cache_data` dictionary and initializes an additional list
-            `key_list` to keep track of the order of keys for MRU eviction.
-        """
-        super().__init__()
-        self.key_list = []
+    """Class that inherits from BaseCaching and is an MRU caching system
 
-    def put(self, key, item):
-        """
-        Stores an item in the cache.
+    -   When the cache is over budget, the most recently used (MRU) item
+        is removed.
 
-        Args:
-            key (str): The key to identify the item.
-            item (any): The item to be stored.
+    -   Reading or storing an item under an existing key marks that key
+        as the most recently used one.
+    """
+    POLICY_STATE = ('key_order',)
 
-        -   If both `key` and `item` are provided,
-            the item is added to the cache dictionary.
-
-        -   If adding a new item exceeds the cache limit defined in
-            `BaseCaching.MAX_ITEMS`, the most recently used (MRU) item
-            is removed.
-
-        -   If the `key` already exists, it removes the key from
-            its current position in `key_list` before re-adding it
-            to the end, updating the cache's MRU order.
-        """
-        if key and item:
-            if len(self.cache_data) >= BaseCaching.MAX_ITEMS and \
-                                       key not in self.cache_data:
-                self.evict()
-            if key in self.cache_data:
-                self.key_list.remove(key)
-
-            self.key_list.append(key)
-
-            self.cache_data[key] = item
-
-    def get(self, key):
+    def __init__(self, **kwargs):
+        """Initializes the MRUCache instance.
+            Calls the parent class's constructor to initialize the
+            `cache_data` dictionary and the options given in `kwargs`
+            (see `BaseCaching`), and initializes an
+            additional `KeyOrder` index `key_order` to keep track of the
+            order of keys for MRU eviction.
         """
-        Retrieves an item from the cache.
+        super().__init__(**kwargs)
+        self.key_order = KeyOrder()
 
-        Args:
-            key (str): The key of the item to retrieve.
+    def _admit(self, key):
+        """Adds a new key as the most recently used one"""
+        self.key_order.push(key)
 
-        Returns:
-            The value associated with the key if found, otherwise None.
+    def _refresh(self, key):
+        """Marks an updated key as the most recently used one"""
+        self.key_order.touch(key)
 
-        -  If the `key` exists, it removes the key from its current position in
-          `key_list` and re-adds it to the end, updating the MRU order.
-        """
-        if key and key in self.cache_data:
-            self.key_list.remove(key)
-            self.key_list.append(key)
-            return self.cache_data[key]
-        return None
+    def _touch(self, key):
+        """Marks a read key as the most recently used one"""
+        self.key_order.touch(key)
 
-    def evict(self):
-        """Evicts the most recently used item from the cache."""
+    def _forget(self, key):
+        """Removes a key from the MRU order"""
+        self.key_order.discard(key)
 
-        del_key = self.key_list.pop()
-        del self.cache_data[del_key]
-        print(f'DISCARD: {del_key}')
+    def _victim(self):
+        """Picks the most recently used item of the cache"""
+        return self.key_order.pop_newest()
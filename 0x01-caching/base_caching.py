@@ -1,32 +1,583 @@
 #!/usr/bin/python3
 """ BaseCaching module
 """
+import heapq
+import itertools
+import os
+import pickle
+import sys
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import nullcontext
+
 
 class BaseCaching():
     """ BaseCaching defines:
       - constants of your caching system
       - where your data are stored (in a dictionary)
+      - the budget of each instance, in entries and/or bytes
+      - the put/get flow shared by every eviction policy
+      - an optional lock making every public method thread-safe
+      - hit, miss, put and eviction counters, reported by `stats`
+      - optional time-to-live of the entries, checked lazily on `get`
+        and reclaimed in deadline order by `sweep`
+      - batch (`get_many`, `put_many`) and mapping-like (`delete`, `in`,
+        `len`, `clear`) operations
+      - binary snapshots of the entries and of the policy state, listed
+        in `POLICY_STATE`, for a warm restart
+
+    Subclasses plug their policy in through the `_admit`, `_refresh`,
+    `_touch`, `_forget` and `_victim` hooks, and may watch requests
+    through `_observe` and `_prepare`.
     """
     MAX_ITEMS = 4
+    POLICY_STATE = ()
+    SNAPSHOT_MAGIC = b"BCSNAP\x01"
 
-    def __init__(self):
+    def __init__(self, max_items=None, max_bytes=None, sizer=None,
+                 thread_safe=False, verbose=False, on_evict=None,
+                 ttl=None, clock=time.monotonic, store=None):
         """ Initiliaze
+
+        Args:
+            max_items (int): Maximum number of entries. Defaults to
+                `MAX_ITEMS`, or to no entry limit when only `max_bytes`
+                is given.
+            max_bytes (int): Maximum total size of the stored items, as
+                measured by `sizer`. Defaults to no byte limit.
+            sizer (callable): Returns the approximate size in bytes of an
+                item. Defaults to `sys.getsizeof`.
+            thread_safe (bool): Whether put/get/evict run under a
+                re-entrant lock, so the cache can be shared by threads.
+            verbose (bool): Whether evictions print `DISCARD: <key>`.
+            on_evict (callable): Called as `on_evict(key, value, reason)`
+                after an entry is evicted, with the cache lock held.
+                `reason` is "capacity" for budget evictions and
+                "expired" for entries past their time-to-live.
+            ttl (float): Default time-to-live of the entries, in seconds.
+                Defaults to entries that never expire.
+            clock (callable): Returns the current time in seconds, used
+                for the time-to-live. Defaults to `time.monotonic`.
+            store (MutableMapping): Where the items are kept, used as
+                `cache_data`; e.g. a `MappedStore` keeps them off-heap.
+                Defaults to a new dictionary.
+
+        Item sizes are only tracked when `max_bytes` or `sizer` is given;
+        `current_bytes` stays at 0 otherwise.
         """
-        self.cache_data = {}
+        if max_items is None and max_bytes is None:
+            max_items = self.MAX_ITEMS
+        if max_items is not None and max_items < 1:
+            raise ValueError("max_items must be a positive integer")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be a positive integer")
+        self.cache_data = {} if store is None else store
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.sizer = sizer or sys.getsizeof
+        self.key_sizes = {} if sizer or max_bytes is not None else None
+        self.current_bytes = 0
+        self.lock = threading.RLock() if thread_safe else nullcontext()
+        self.verbose = verbose
+        self.on_evict = on_evict
+        self.hits = 0
+        self.misses = 0
+        self.puts = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.ttl = ttl
+        self.clock = clock
+        self.expires = {}
+        self._deadlines = []
+        self._sequence = itertools.count()
+        self._sweeper = None
 
     def print_cache(self):
         """ Print the cache
         """
-        print("Current cache:")
-        for key in sorted(self.cache_data.keys()):
-            print("{}: {}".format(key, self.cache_data.get(key)))
+        with self.lock:
+            print("Current cache:")
+            for key in sorted(self.cache_data.keys()):
+                print("{}: {}".format(key, self.cache_data.get(key)))
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """ Add an item in the cache
+
+        Args:
+            key (str): The key to identify the item.
+            item (any): The item to be stored.
+            ttl (float): Time-to-live of the item, in seconds. Defaults
+                to the `ttl` of the cache.
+
+        -   If `key` or `item` is missing, nothing is stored.
+
+        -   Entries are evicted following the policy of the subclass
+            until the item fits the entry and byte budgets. An item
+            larger than `max_bytes` on its own is not stored, and any
+            older value under `key` is dropped.
+
+        -   Expired entries are reclaimed before any live entry is
+            evicted to make room.
         """
-        raise NotImplementedError("put must be implemented in your cache class")
+        if key and item:
+            size = self.sizer(item) if self.key_sizes is not None else 0
+            with self.lock:
+                self.puts += 1
+                self._observe(key)
+                if self.max_bytes is not None and size > self.max_bytes:
+                    if key in self.cache_data:
+                        self._remove(key)
+                    return
+                if key not in self.cache_data:
+                    self._prepare(key)
+                self._make_room(key, size)
+                self._store(key, item, size, ttl)
 
     def get(self, key):
         """ Get an item by key
+
+        Returns:
+            The value associated with the key if found and not expired,
+            otherwise None.
+        """
+        if key:
+            with self.lock:
+                return self._lookup(key)
+        return None
+
+    def put_many(self, items, ttl=None):
+        """ Add several items in the cache as one batch
+
+        Args:
+            items: A mapping, or an iterable of `(key, item)` pairs. Pairs
+                with a missing key or item are skipped; when a key repeats,
+                its last item wins.
+            ttl (float): Time-to-live of the items, in seconds. Defaults
+                to the `ttl` of the cache.
+
+        The batch is admitted as a unit: the room it needs is made once,
+        up front, so victims are picked among the entries present before
+        the batch and the policy order is updated once per key. When the
+        batch alone exceeds a budget, only its last items that fit are
+        stored, and older values of the skipped keys are dropped.
+        """
+        if hasattr(items, 'items'):
+            items = items.items()
+        batch = {}
+        for key, item in items:
+            if key and item:
+                batch.pop(key, None)
+                batch[key] = item
+        sized = self.key_sizes is not None
+        sizes = {key: self.sizer(item) for key, item in batch.items()} \
+            if sized else dict.fromkeys(batch, 0)
+        with self.lock:
+            self.puts += len(batch)
+            for key in batch:
+                self._observe(key)
+            keys = self._fitting(list(batch), sizes)
+            wanted = set(keys)
+            for key in batch:
+                if key not in wanted and key in self.cache_data:
+                    self._remove(key)
+            for key in keys:
+                if key not in self.cache_data:
+                    self._prepare(key)
+            need_items, need_bytes = self._needs(keys, sizes)
+            if self._deadlines and self._over(need_items, need_bytes):
+                self.sweep()
+                need_items, need_bytes = self._needs(keys, sizes)
+            while self.cache_data and self._over(need_items, need_bytes):
+                del_key = self._victim()
+                if del_key in wanted:
+                    need_items += 1
+                    if sized:
+                        need_bytes += self.key_sizes[del_key]
+                self._discard(del_key, 'capacity')
+            for key in keys:
+                self._store(key, batch[key], sizes[key], ttl)
+
+    def get_many(self, keys):
+        """ Get the items of several keys at once
+
+        Returns:
+            dict: The found, unexpired items by key. Missing keys are left
+            out.
+        """
+        found = {}
+        with self.lock:
+            for key in keys:
+                if key:
+                    item = self._lookup(key)
+                    if item is not None:
+                        found[key] = item
+        return found
+
+    def delete(self, key):
+        """ Remove an item from the cache
+
+        Returns:
+            bool: Whether `key` was in the cache.
+        """
+        with self.lock:
+            if key in self.cache_data:
+                self._remove(key)
+                return True
+            return False
+
+    def clear(self):
+        """ Remove every item from the cache, keeping the counters
+        """
+        with self.lock:
+            for key in list(self.cache_data):
+                self._remove(key)
+            self._deadlines = []
+
+    def snapshot(self, path):
+        """ Save the entries and the policy state of the cache to `path`
+
+        The file holds a header followed by one pickle (protocol 5) of
+        the items in insertion order, their sizes, their remaining
+        time-to-live and the attributes named in `POLICY_STATE`, such as
+        the LRU order or the LFU frequencies. It is written to a
+        temporary file first and moved into place.
+
+        When `cache_data` is a store with a `flush` method (such as
+        `MappedStore`), the store is flushed and only its keys are saved;
+        the items stay in the store.
+        """
+        with self.lock:
+            now = self.clock()
+            if hasattr(self.cache_data, 'flush'):
+                self.cache_data.flush()
+                entries = list(self.cache_data)
+            else:
+                entries = self.cache_data
+            state = {
+                "policy": type(self).__name__,
+                "entries": entries,
+                "sizes": self.key_sizes,
+                "ttls": {key: deadline - now
+                         for key, deadline in self.expires.items()},
+                "state": {name: getattr(self, name)
+                          for name in self.POLICY_STATE}
+            }
+            tmp = "{}.tmp".format(path)
+            with open(tmp, "wb") as f:
+                f.write(self.SNAPSHOT_MAGIC)
+                pickle.dump(state, f, protocol=5)
+            os.replace(tmp, path)
+
+    def load(self, path):
+        """ Replace the content of the cache with a snapshot from `path`
+
+        The budgets and options of this instance are kept; entries are
+        evicted by policy if the snapshot does not fit them. Snapshots
+        are pickles: only load files written by `snapshot`.
+
+        Raises:
+            ValueError: If the file is not a snapshot, or was taken from
+                a cache of another policy.
+        """
+        with open(path, "rb") as f:
+            if f.read(len(self.SNAPSHOT_MAGIC)) != self.SNAPSHOT_MAGIC:
+                raise ValueError("{} is not a cache snapshot".format(path))
+            state = pickle.load(f)
+        if state["policy"] != type(self).__name__:
+            raise ValueError("snapshot of a {}, not a {}".format(
+                state["policy"], type(self).__name__))
+        with self.lock:
+            if isinstance(state["entries"], Mapping):
+                self.cache_data.clear()
+                self.cache_data.update(state["entries"])
+            else:
+                kept = set(state["entries"])
+                for key in list(self.cache_data):
+                    if key not in kept:
+                        del self.cache_data[key]
+            for name, value in state["state"].items():
+                setattr(self, name, value)
+            for key in state["entries"]:
+                if key not in self.cache_data:
+                    self._forget(key)
+            if self.key_sizes is not None:
+                sizes = state["sizes"] or {}
+                self.key_sizes = {
+                    key: sizes[key] if key in sizes else
+                    self.sizer(self.cache_data[key])
+                    for key in self.cache_data}
+                self.current_bytes = sum(self.key_sizes.values())
+            now = self.clock()
+            self.expires = {}
+            self._deadlines = []
+            for key, ttl in state["ttls"].items():
+                if key in self.cache_data:
+                    self._expire_at(key, now + ttl)
+            while self.cache_data and self._over(0, 0):
+                self.evict()
+
+    def __contains__(self, key):
+        """ Check whether `key` holds an unexpired item
+
+        Unlike `get`, this neither counts as an access nor changes the
+        policy order.
+        """
+        with self.lock:
+            if key not in self.cache_data:
+                return False
+            return key not in self.expires or \
+                self.expires[key] > self.clock()
+
+    def __len__(self):
+        """ Number of stored entries, including expired ones that were not
+        reclaimed yet
+        """
+        return len(self.cache_data)
+
+    def evict(self):
+        """ Evict the entry chosen by the policy of the cache
+
+        Returns:
+            The evicted key.
+        """
+        with self.lock:
+            del_key = self._victim()
+            self._discard(del_key, 'capacity')
+            return del_key
+
+    def sweep(self):
+        """ Reclaim every expired entry
+
+        Deadlines are kept in a heap, so only entries that are due (or
+        heap records made stale by a later put or removal) are visited.
+
+        Returns:
+            int: The number of entries reclaimed.
+        """
+        with self.lock:
+            now = self.clock()
+            expired = 0
+            deadlines = self._deadlines
+            while deadlines and deadlines[0][0] <= now:
+                deadline, _, key = heapq.heappop(deadlines)
+                if self.expires.get(key) == deadline:
+                    self._discard(key, 'expired')
+                    expired += 1
+            return expired
+
+    def start_sweeper(self, interval=1.0):
+        """ Call `sweep` every `interval` seconds from a daemon thread
+
+        Raises:
+            RuntimeError: If the cache is not thread-safe, or a sweeper
+                is already running.
+        """
+        if isinstance(self.lock, nullcontext):
+            raise RuntimeError("start_sweeper needs a thread_safe cache")
+        if self._sweeper is not None:
+            raise RuntimeError("sweeper already running")
+        stop = threading.Event()
+
+        def run():
+            """ Sweep until stopped """
+            while not stop.wait(interval):
+                self.sweep()
+
+        thread = threading.Thread(target=run, name="cache-sweeper",
+                                  daemon=True)
+        self._sweeper = (thread, stop)
+        thread.start()
+
+    def stop_sweeper(self):
+        """ Stop the thread started by `start_sweeper`, if any
+        """
+        if self._sweeper is not None:
+            thread, stop = self._sweeper
+            self._sweeper = None
+            stop.set()
+            thread.join()
+
+    def stats(self):
+        """ Snapshot of the counters and of the current size of the cache
+
+        Returns:
+            dict: `hits`, `misses`, `puts`, `evictions`, `expirations`,
+            `size` (entries), `bytes` (tracked item size) and `hit_ratio`
+            (hits over gets, 0.0 before the first get).
+        """
+        with self.lock:
+            gets = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "puts": self.puts,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self.cache_data),
+                "bytes": self.current_bytes,
+                "hit_ratio": self.hits / gets if gets else 0.0
+            }
+
+    def _discard(self, key, reason):
+        """ Evict `key`, then report it as configured
+        """
+        value = self.cache_data[key]
+        self._remove(key)
+        if reason == 'expired':
+            self.expirations += 1
+        else:
+            self.evictions += 1
+        if self.verbose:
+            print(f'DISCARD: {key}')
+        if self.on_evict is not None:
+            self.on_evict(key, value, reason)
+
+    def _lookup(self, key):
+        """ Return the unexpired item of `key` and count the access
+        """
+        self._observe(key)
+        if key in self.cache_data:
+            if key in self.expires and self.expires[key] <= self.clock():
+                self._discard(key, 'expired')
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touch(key)
+            return self.cache_data[key]
+        self.misses += 1
+        return None
+
+    def _store(self, key, item, size, ttl):
+        """ Store an item once room was made for it
+        """
+        if key in self.cache_data:
+            self._refresh(key)
+        else:
+            self._admit(key)
+        self.cache_data[key] = item
+        if self.key_sizes is not None:
+            self.current_bytes += size - self.key_sizes.get(key, 0)
+            self.key_sizes[key] = size
+        if ttl is None:
+            ttl = self.ttl
+        if ttl is not None:
+            self._expire_at(key, self.clock() + ttl)
+        elif self.expires:
+            self.expires.pop(key, None)
+
+    def _make_room(self, key, size):
+        """ Evict entries until `size` more bytes fit under `key`
+
+        The entry already stored under `key` may itself be picked by the
+        policy; the new item is then admitted as a fresh entry.
+        """
+        if self._deadlines and self._over_budget(key, size):
+            self.sweep()
+        while self.cache_data and self._over_budget(key, size):
+            self.evict()
+
+    def _over_budget(self, key, size):
+        """ Check whether storing `size` bytes under `key` exceeds a budget
+        """
+        if key in self.cache_data:
+            if self.max_bytes is None:
+                return False
+            return self._over(0, size - self.key_sizes[key])
+        return self._over(1, size)
+
+    def _over(self, items, size):
+        """ Check whether `items` more entries and `size` more bytes exceed
+        a budget
+        """
+        if self.max_items is not None and \
+                len(self.cache_data) + items > self.max_items:
+            return True
+        return self.max_bytes is not None and \
+            self.current_bytes + size > self.max_bytes
+
+    def _needs(self, keys, sizes):
+        """ Entries and bytes the cache grows by when storing `keys`
+        """
+        items = 0
+        size = 0
+        for key in keys:
+            size += sizes[key]
+            if key in self.cache_data:
+                if self.key_sizes is not None:
+                    size -= self.key_sizes[key]
+            else:
+                items += 1
+        return items, size
+
+    def _fitting(self, keys, sizes):
+        """ The longest tail of `keys` that fits the budgets on its own
+        """
+        if self.max_items is not None and len(keys) > self.max_items:
+            keys = keys[-self.max_items:]
+        if self.max_bytes is not None:
+            total = 0
+            for start in range(len(keys) - 1, -1, -1):
+                total += sizes[keys[start]]
+                if total > self.max_bytes:
+                    keys = keys[start + 1:]
+                    break
+        return keys
+
+    def _remove(self, key):
+        """ Drop `key` from the stored data and from the policy
+        """
+        del self.cache_data[key]
+        if self.key_sizes is not None:
+            self.current_bytes -= self.key_sizes.pop(key)
+        if self.expires:
+            self.expires.pop(key, None)
+        self._forget(key)
+
+    def _expire_at(self, key, deadline):
+        """ Set the deadline of `key` and schedule it for `sweep`
+
+        Heap records left behind by earlier deadlines are skipped when
+        they come due; the heap is rebuilt once they outnumber the live
+        deadlines, keeping it proportional to the cache.
+        """
+        self.expires[key] = deadline
+        deadlines = self._deadlines
+        heapq.heappush(deadlines, (deadline, next(self._sequence), key))
+        if len(deadlines) > 2 * len(self.expires) + 64:
+            self._deadlines = [(deadline, next(self._sequence), key)
+                               for key, deadline in self.expires.items()]
+            heapq.heapify(self._deadlines)
+
+    def _observe(self, key):
+        """ Register a get or put request for `key`, hit or miss
+        """
+
+    def _prepare(self, key):
+        """ Register a key about to be added, before room is made for it
+        """
+
+    def _admit(self, key):
+        """ Register a key that was just added to the cache
+        """
+
+    def _refresh(self, key):
+        """ Register a new item stored under an existing key
+        """
+
+    def _touch(self, key):
+        """ Register a read of an existing key
+        """
+
+    def _forget(self, key):
+        """ Unregister a key that left the cache
+        """
+
+    def _victim(self):
+        """ Return the next key to evict, still in `cache_data`
+
+        Policies keeping their own order may unregister the key here
+        already; `_forget` is called for it afterwards either way.
         """
-        raise NotImplementedError("get must be implemented in your cache class")
+        raise NotImplementedError(
+            "evict must be implemented in your cache class")
@@ -0,0 +1,51 @@
+#!/usr/bin/python3
+""" Per-operation latency of the eviction policies at growing sizes
+
+Usage: ./bench_eviction.py [max_size]
+
+Each cache is filled to capacity, then driven with a mix of hits and
+misses (every miss evicts). With O(1) bookkeeping the ns/op column
+should stay flat from 10 entries up to 1M.
+"""
+import random
+import sys
+import time
+
+FIFOCache = __import__('1-fifo_cache').FIFOCache
+LIFOCache = __import__('2-lifo_cache').LIFOCache
+LRUCache = __import__('3-lru_cache').LRUCache
+MRUCache = __import__('4-mru_cache').MRUCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+
+POLICIES = (FIFOCache, LIFOCache, LRUCache, MRUCache, LFUCache)
+OPERATIONS = 100000
+
+
+def bench(policy, size):
+    """Returns the mean ns per get/put on a full cache of `size` entries"""
+    cache = policy(max_items=size)
+    rand = random.Random(size)
+    keys = [rand.randrange(size * 2) + 1 for _ in range(OPERATIONS)]
+    for key in range(1, size + 1):
+        cache.put(key, key)
+    start = time.perf_counter()
+    for key in keys:
+        if cache.get(key) is None:
+            cache.put(key, key)
+    elapsed = time.perf_counter() - start
+    return elapsed / OPERATIONS * 1e9
+
+
+if __name__ == "__main__":
+    max_size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    sizes = []
+    size = 10
+    while size <= max_size:
+        sizes.append(size)
+        size *= 10
+    print("{:>10}".format("entries") +
+          "".join("{:>12}".format(p.__name__) for p in POLICIES))
+    for size in sizes:
+        print("{:>10}".format(size) +
+              "".join("{:>12.0f}".format(bench(p, size)) for p in POLICIES))
+    print("(mean ns per operation)")
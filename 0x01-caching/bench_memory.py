@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+""" Memory cost per entry of the caches at a large size
+
+Usage: ./bench_memory.py [entries]
+
+Keys and values are allocated before each measurement, so the figures
+only cover the bookkeeping of the caches: the `cache_data` storage plus
+the policy order (and frequencies for LFU).
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+FIFOCache = __import__('1-fifo_cache').FIFOCache
+LRUCache = __import__('3-lru_cache').LRUCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+compact_cache = __import__('compact_cache')
+
+POLICIES = (FIFOCache, LRUCache, LFUCache, compact_cache.CompactFIFOCache,
+            compact_cache.CompactLRUCache)
+
+
+def measure(policy, keys):
+    """Returns the bytes per entry and the fill time of a full cache"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        cache = policy(max_items=len(keys))
+        for key in keys:
+            cache.put(key, key)
+        elapsed = time.perf_counter() - start
+        used = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert len(cache) == len(keys)
+    return used / len(keys), elapsed
+
+
+if __name__ == "__main__":
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    keys = ["key{}".format(n) for n in range(entries)]
+    print("{} entries".format(entries))
+    print("{:>18} {:>12} {:>12}".format("policy", "bytes/entry",
+                                        "fill s"))
+    for policy in POLICIES:
+        per_entry, elapsed = measure(policy, keys)
+        print("{:>18} {:>12.1f} {:>12.2f}".format(policy.__name__,
+                                                  per_entry, elapsed))
@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+""" Multi-threaded stress test and throughput of the locked caches
+
+Usage: ./bench_threads.py [max_threads]
+
+Every thread hammers the same cache with a mix of get and put. After
+each run the cache is checked for consistency between `cache_data` and
+the policy bookkeeping, then the aggregate throughput is reported for
+a single locked cache and for a lock-striped `ShardedCache`.
+"""
+import random
+import sys
+import threading
+import time
+
+LRUCache = __import__('3-lru_cache').LRUCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+ShardedCache = __import__('sharded_cache').ShardedCache
+
+CAPACITY = 10000
+OPERATIONS = 50000
+
+
+def worker(cache, seed, barrier):
+    """Runs OPERATIONS random gets and puts against `cache`"""
+    rand = random.Random(seed)
+    keys = [rand.randrange(CAPACITY * 2) + 1 for _ in range(OPERATIONS)]
+    barrier.wait()
+    for key in keys:
+        if cache.get(key) is None:
+            cache.put(key, key)
+
+
+def check(cache):
+    """Asserts that every cache agrees with its policy bookkeeping"""
+    shards = getattr(cache, 'shards', [cache])
+    for shard in shards:
+        assert set(shard.cache_data) == set(shard.key_order)
+        assert len(shard.cache_data) <= shard.max_items
+
+
+def run(make_cache, threads):
+    """Returns the aggregate ops/s of `threads` threads on a new cache"""
+    cache = make_cache()
+    barrier = threading.Barrier(threads + 1)
+    pool = [threading.Thread(target=worker, args=(cache, n, barrier))
+            for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    check(cache)
+    return threads * OPERATIONS / elapsed
+
+
+if __name__ == "__main__":
+    max_threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    variants = (
+        ("LRU locked", lambda: LRUCache(max_items=CAPACITY,
+                                        thread_safe=True)),
+        ("LRU sharded", lambda: ShardedCache(LRUCache, shards=16,
+                                             max_items=CAPACITY)),
+        ("LFU locked", lambda: LFUCache(max_items=CAPACITY,
+                                        thread_safe=True)),
+        ("LFU sharded", lambda: ShardedCache(LFUCache, shards=16,
+                                             max_items=CAPACITY)),
+    )
+    counts = []
+    threads = 1
+    while threads <= max_threads:
+        counts.append(threads)
+        threads *= 2
+    print("{:>12}".format("threads") +
+          "".join("{:>14}".format(name) for name, _ in variants))
+    for threads in counts:
+        rates = [run(make, threads) for _, make in variants]
+        print("{:>12}".format(threads) +
+              "".join("{:>14.0f}".format(rate) for rate in rates))
+    print("(operations per second, consistency checked after each run)")
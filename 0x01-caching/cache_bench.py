@@ -0,0 +1,212 @@
+#!/usr/bin/python3
+""" Trace replay and benchmarking harness for the caching policies
+
+Usage: ./cache_bench.py [-h] [--trace FILE] [--workload {zipf,uniform,scan}]
+                        [--length N] [--keys N] [--capacity N]
+                        [--policy NAME] [--no-memory]
+
+A trace is a sequence of (operation, key) events. In a trace file each
+line is either `get <key>`, `put <key>` or a bare `<key>`; a bare key
+is a read-through access, i.e. a get followed by a put on a miss. The
+synthetic workloads only produce read-through accesses.
+
+Every policy replays the same trace and reports its throughput, the
+p50/p99 latency of one event, its hit ratio and the peak memory
+allocated while replaying.
+"""
+import argparse
+import bisect
+import itertools
+import random
+import time
+import tracemalloc
+
+BasicCache = __import__('0-basic_cache').BasicCache
+FIFOCache = __import__('1-fifo_cache').FIFOCache
+LIFOCache = __import__('2-lifo_cache').LIFOCache
+LRUCache = __import__('3-lru_cache').LRUCache
+MRUCache = __import__('4-mru_cache').MRUCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+ARCCache = __import__('101-arc_cache').ARCCache
+TwoQueueCache = __import__('102-two_queue_cache').TwoQueueCache
+TinyLFUCache = __import__('103-tinylfu_cache').TinyLFUCache
+
+POLICIES = (BasicCache, FIFOCache, LIFOCache, LRUCache, MRUCache,
+            LFUCache, ARCCache, TwoQueueCache, TinyLFUCache)
+READ = 'read'
+OPERATIONS = ('get', 'put', READ)
+
+
+def load_trace(path):
+    """Returns the events of a trace file"""
+    trace = []
+    with open(path) as f:
+        for line in f:
+            fields = line.split()
+            if not fields:
+                continue
+            if len(fields) == 1:
+                trace.append((READ, fields[0]))
+            elif fields[0] in OPERATIONS:
+                trace.append((fields[0], fields[1]))
+            else:
+                raise ValueError("bad trace line: {!r}".format(line))
+    return trace
+
+
+def zipf_trace(length, keys, skew=1.0, seed=0):
+    """Returns `length` reads of `keys` keys with Zipf popularity"""
+    rand = random.Random(seed)
+    cumulative = list(itertools.accumulate(1 / rank ** skew
+                                           for rank in range(1, keys + 1)))
+    total = cumulative[-1]
+    return [(READ, "k{}".format(bisect.bisect(cumulative,
+                                              rand.random() * total)))
+            for _ in range(length)]
+
+
+def uniform_trace(length, keys, seed=0):
+    """Returns `length` reads of `keys` equally popular keys"""
+    rand = random.Random(seed)
+    return [(READ, "k{}".format(rand.randrange(keys)))
+            for _ in range(length)]
+
+
+def scan_trace(length, keys, scan=None, every=None, seed=0):
+    """Returns a Zipf trace interrupted by sequential scans
+
+    After every `every` reads (default: `keys`), `scan` keys never seen
+    before (default: a quarter of `keys`) are read in sequence.
+    """
+    every = every or keys
+    scan = scan or max(1, keys // 4)
+    hot = zipf_trace(length, keys, seed=seed)
+    trace = []
+    fresh = keys
+    for start in range(0, length, every):
+        trace.extend(hot[start:start + every])
+        for _ in range(scan):
+            fresh += 1
+            trace.append((READ, "k{}".format(fresh)))
+    return trace[:length]
+
+
+WORKLOADS = {"zipf": zipf_trace, "uniform": uniform_trace,
+             "scan": scan_trace}
+
+
+def make_cache(policy, capacity):
+    """Returns a new `policy` cache of `capacity` entries
+
+    Policies without an eviction policy (`MAX_ITEMS` set to None, such as
+    `BasicCache`) are created unbounded.
+    """
+    if policy.MAX_ITEMS is None:
+        return policy()
+    return policy(max_items=capacity)
+
+
+def _run(cache, trace, clock=None):
+    """Replays `trace` on `cache`, returns the sorted event latencies"""
+    get, put = cache.get, cache.put
+    latencies = []
+    for operation, key in trace:
+        start = clock() if clock else 0
+        if operation == READ:
+            if get(key) is None:
+                put(key, True)
+        elif operation == 'get':
+            get(key)
+        else:
+            put(key, True)
+        if clock:
+            latencies.append(clock() - start)
+    latencies.sort()
+    return latencies
+
+
+def replay(policy, trace, capacity, memory=True):
+    """Replays `trace` against a new `policy` cache of `capacity` entries
+
+    Returns:
+        dict: `policy`, `events`, `seconds`, `throughput` (events per
+        second), `p50_ns` and `p99_ns` (event latency), `hit_ratio` and
+        `peak_bytes` (None unless `memory`). The peak memory comes from a
+        second, traced replay, so tracing does not skew the timings.
+    """
+    cache = make_cache(policy, capacity)
+    start = time.perf_counter()
+    _run(cache, trace)
+    seconds = time.perf_counter() - start
+    latencies = _run(make_cache(policy, capacity), trace,
+                     time.perf_counter_ns)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            _run(make_cache(policy, capacity), trace)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    events = len(trace)
+    return {
+        "policy": policy.__name__,
+        "events": events,
+        "seconds": seconds,
+        "throughput": events / seconds if seconds else 0.0,
+        "p50_ns": latencies[events // 2] if events else 0,
+        "p99_ns": latencies[events * 99 // 100] if events else 0,
+        "hit_ratio": cache.stats()["hit_ratio"],
+        "peak_bytes": peak
+    }
+
+
+def report(results):
+    """Prints one line per replay result"""
+    print("{:>14} {:>12} {:>9} {:>9} {:>8} {:>11}".format(
+        "policy", "events/s", "p50 ns", "p99 ns", "hits", "peak KiB"))
+    for result in results:
+        peak = result["peak_bytes"]
+        print("{:>14} {:>12.0f} {:>9} {:>9} {:>8.2%} {:>11}".format(
+            result["policy"], result["throughput"], result["p50_ns"],
+            result["p99_ns"], result["hit_ratio"],
+            "-" if peak is None else peak // 1024))
+
+
+def main(argv=None):
+    """Runs the harness from the command line"""
+    names = {policy.__name__: policy for policy in POLICIES}
+    parser = argparse.ArgumentParser(description="Replay a key-access "
+                                     "trace against the caching policies")
+    parser.add_argument("--trace", help="trace file to replay")
+    parser.add_argument("--workload", choices=sorted(WORKLOADS),
+                        default="scan", help="synthetic workload to use "
+                        "without --trace (default: scan)")
+    parser.add_argument("--length", type=int, default=200000,
+                        help="events of the synthetic workload")
+    parser.add_argument("--keys", type=int, default=20000,
+                        help="distinct keys of the synthetic workload")
+    parser.add_argument("--capacity", type=int, default=1000,
+                        help="max_items of every cache")
+    parser.add_argument("--policy", action="append", choices=sorted(names),
+                        help="policy to run, repeatable (default: all)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the traced replay measuring memory")
+    args = parser.parse_args(argv)
+    if args.trace:
+        trace = load_trace(args.trace)
+        source = args.trace
+    else:
+        trace = WORKLOADS[args.workload](args.length, args.keys)
+        source = "{} workload over {} keys".format(args.workload,
+                                                   args.keys)
+    policies = [names[name] for name in args.policy] if args.policy \
+        else POLICIES
+    print("{}: {} events, capacity {}".format(source, len(trace),
+                                              args.capacity))
+    report(replay(policy, trace, args.capacity, not args.no_memory)
+           for policy in policies)
+
+
+if __name__ == "__main__":
+    main()
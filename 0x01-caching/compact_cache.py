@@ -0,0 +1,187 @@
+#!/usr/bin/python3
+""" Compact, array-backed caching for large caches """
+from array import array
+from collections.abc import MutableMapping
+
+BaseCaching = __import__('base_caching').BaseCaching
+
+
+class SlotTable(MutableMapping):
+    """Ordered dictionary stored in columns indexed by slot number
+
+    Each entry owns one slot: its key and value sit in two lists, and
+    its links to the previous and next entries in two `array('i')`
+    columns. The only per-entry Python objects left are the slot number
+    held by the key index; freed slots are chained through the `next`
+    column and reused. Entries are kept in insertion order, and moving
+    one to the end or reading the oldest is O(1), so the table is at
+    once the `cache_data` and the eviction order of a cache.
+    """
+    __slots__ = ('_slots', '_keys', '_values', '_prev', '_next', '_head',
+                 '_tail', '_free')
+    NIL = -1
+
+    def __init__(self, items=()):
+        """Initializes a table holding `items`, a mapping or pairs"""
+        self._slots = {}
+        self._keys = []
+        self._values = []
+        self._prev = array('i')
+        self._next = array('i')
+        self._head = self.NIL
+        self._tail = self.NIL
+        self._free = self.NIL
+        self.update(items)
+
+    def __getitem__(self, key):
+        """Returns the value of `key`"""
+        return self._values[self._slots[key]]
+
+    def __setitem__(self, key, value):
+        """Sets the value of `key`, appending new keys at the end"""
+        slot = self._slots.get(key)
+        if slot is not None:
+            self._values[slot] = value
+            return
+        if self._free != self.NIL:
+            slot = self._free
+            self._free = self._next[slot]
+            self._keys[slot] = key
+            self._values[slot] = value
+            self._prev[slot] = self._tail
+            self._next[slot] = self.NIL
+        else:
+            slot = len(self._keys)
+            self._keys.append(key)
+            self._values.append(value)
+            self._prev.append(self._tail)
+            self._next.append(self.NIL)
+        if self._tail == self.NIL:
+            self._head = slot
+        else:
+            self._next[self._tail] = slot
+        self._tail = slot
+        self._slots[key] = slot
+
+    def __delitem__(self, key):
+        """Removes `key` and frees its slot"""
+        slot = self._slots.pop(key)
+        self._unlink(slot)
+        self._keys[slot] = None
+        self._values[slot] = None
+        self._next[slot] = self._free
+        self._free = slot
+
+    def __contains__(self, key):
+        """Checks whether `key` is stored"""
+        return key in self._slots
+
+    def __iter__(self):
+        """Iterates over the keys from the oldest to the newest"""
+        keys, following = self._keys, self._next
+        slot = self._head
+        while slot != self.NIL:
+            yield keys[slot]
+            slot = following[slot]
+
+    def __len__(self):
+        """Returns the number of stored keys"""
+        return len(self._slots)
+
+    def __getstate__(self):
+        """Returns the `(key, value)` pairs in order, for pickling"""
+        return list(self.items())
+
+    def __setstate__(self, items):
+        """Restores the pairs returned by `__getstate__`"""
+        self.__init__(items)
+
+    def clear(self):
+        """Removes every entry at once"""
+        self.__init__()
+
+    def move_to_end(self, key):
+        """Makes `key` the newest entry"""
+        slot = self._slots[key]
+        if slot != self._tail:
+            self._unlink(slot)
+            self._prev[slot] = self._tail
+            self._next[slot] = self.NIL
+            self._next[self._tail] = slot
+            self._tail = slot
+
+    def oldest(self):
+        """Returns the oldest key"""
+        return self._keys[self._head]
+
+    def newest(self):
+        """Returns the newest key"""
+        return self._keys[self._tail]
+
+    def _unlink(self, slot):
+        """Detaches `slot` from its neighbours"""
+        before, after = self._prev[slot], self._next[slot]
+        if before == self.NIL:
+            self._head = after
+        else:
+            self._next[before] = after
+        if after == self.NIL:
+            self._tail = before
+        else:
+            self._prev[after] = before
+
+
+class CompactLRUCache(BaseCaching):
+    """Class that inherits from BaseCaching and is an LRU caching system
+    with a compact memory layout
+
+    It behaves like `LRUCache`, but its `cache_data` is a `SlotTable`
+    that also holds the LRU order, instead of a dictionary next to a
+    separate `KeyOrder`. This trades some speed for a much lower memory
+    cost per entry.
+    """
+    def __init__(self, **kwargs):
+        """Initializes the CompactLRUCache instance.
+            Calls the parent class's constructor with a `SlotTable` as
+            `cache_data` and the options given in `kwargs` (see
+            `BaseCaching`).
+        """
+        kwargs['store'] = SlotTable()
+        super().__init__(**kwargs)
+
+    def _refresh(self, key):
+        """Marks an updated key as the most recently used one"""
+        self.cache_data.move_to_end(key)
+
+    def _touch(self, key):
+        """Marks a read key as the most recently used one"""
+        self.cache_data.move_to_end(key)
+
+    def _victim(self):
+        """Picks the least recently used item of the cache"""
+        return self.cache_data.oldest()
+
+
+class CompactFIFOCache(BaseCaching):
+    """Class that inherits from BaseCaching and is a FIFO caching system
+    with a compact memory layout
+
+    It behaves like `FIFOCache`, with a `SlotTable` as `cache_data`
+    holding the insertion order.
+    """
+    def __init__(self, **kwargs):
+        """Initializes the CompactFIFOCache instance.
+            Calls the parent class's constructor with a `SlotTable` as
+            `cache_data` and the options given in `kwargs` (see
+            `BaseCaching`).
+        """
+        kwargs['store'] = SlotTable()
+        super().__init__(**kwargs)
+
+    def _refresh(self, key):
+        """Moves an updated key to the newest position"""
+        self.cache_data.move_to_end(key)
+
+    def _victim(self):
+        """Picks the oldest item of the cache"""
+        return self.cache_data.oldest()
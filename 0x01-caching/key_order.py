@@ -0,0 +1,204 @@
+#!/usr/bin/python3
+""" Ordered key index shared by the caching policies """
+from collections import OrderedDict
+
+
+class KeyOrder():
+    """Keeps cache keys ordered from oldest to newest.
+
+    Backed by an `OrderedDict`, so every operation below runs in O(1)
+    regardless of how many keys are tracked. FIFO and LRU caches evict
+    from the front (`pop_oldest`), LIFO and MRU caches from the back
+    (`pop_newest`).
+    """
+    __slots__ = ('_keys',)
+
+    def __init__(self):
+        """Initializes an empty key index"""
+        self._keys = OrderedDict()
+
+    def __len__(self):
+        """Returns the number of tracked keys"""
+        return len(self._keys)
+
+    def __contains__(self, key):
+        """Checks whether `key` is tracked"""
+        return key in self._keys
+
+    def __iter__(self):
+        """Iterates over the keys from oldest to newest"""
+        return iter(self._keys)
+
+    def __getstate__(self):
+        """Returns the keys from oldest to newest, for pickling"""
+        return list(self._keys)
+
+    def __setstate__(self, keys):
+        """Restores the keys returned by `__getstate__`"""
+        self._keys = OrderedDict.fromkeys(keys)
+
+    def push(self, key):
+        """Adds `key` as the newest key, moving it there if already tracked"""
+        keys = self._keys
+        if key in keys:
+            keys.move_to_end(key)
+        else:
+            keys[key] = None
+
+    def touch(self, key):
+        """Marks an already tracked `key` as the newest one"""
+        self._keys.move_to_end(key)
+
+    def discard(self, key):
+        """Stops tracking `key` if it is tracked"""
+        self._keys.pop(key, None)
+
+    def oldest(self):
+        """Returns the oldest key without removing it"""
+        return next(iter(self._keys))
+
+    def pop_oldest(self):
+        """Removes and returns the oldest key"""
+        return self._keys.popitem(last=False)[0]
+
+    def pop_newest(self):
+        """Removes and returns the newest key"""
+        return self._keys.popitem(last=True)[0]
+
+
+class _FrequencyNode():
+    """Bucket of keys sharing one access count, oldest access first"""
+    __slots__ = ('count', 'keys', 'prev', 'next')
+
+    def __init__(self, count, prev=None, next=None):
+        """Initializes an empty bucket linked between `prev` and `next`"""
+        self.count = count
+        self.keys = OrderedDict()
+        self.prev = prev
+        self.next = next
+
+
+class FrequencyOrder():
+    """Keeps cache keys ordered by access count, then by last access.
+
+    Keys live in frequency buckets chained in a doubly linked list sorted
+    by count, so the least frequently used bucket is always the head.
+    Inside a bucket keys are kept in LRU order, which breaks ties the
+    same way as scanning an access-ordered list would. Adding, bumping,
+    discarding and popping a key are all O(1).
+    """
+    __slots__ = ('_head', '_nodes')
+
+    def __init__(self):
+        """Initializes an empty frequency index"""
+        self._head = None
+        self._nodes = {}
+
+    def __len__(self):
+        """Returns the number of tracked keys"""
+        return len(self._nodes)
+
+    def __contains__(self, key):
+        """Checks whether `key` is tracked"""
+        return key in self._nodes
+
+    def __iter__(self):
+        """Iterates over the keys from the next eviction candidate on"""
+        for node in self._buckets():
+            yield from node.keys
+
+    def __getstate__(self):
+        """Returns `(key, count)` pairs in iteration order, for pickling
+
+        The bucket chain is flattened so deep chains pickle without
+        recursion.
+        """
+        return [(key, node.count) for node in self._buckets()
+                for key in node.keys]
+
+    def __setstate__(self, pairs):
+        """Restores the pairs returned by `__getstate__` in O(n)"""
+        self._head = None
+        self._nodes = {}
+        last = None
+        for key, count in pairs:
+            if last is None or last.count != count:
+                last = self._link(count, last, None)
+            last.keys[key] = None
+            self._nodes[key] = last
+
+    def frequency(self, key):
+        """Returns the access count of a tracked `key`"""
+        return self._nodes[key].count
+
+    def add(self, key, count=1):
+        """Tracks a new `key` with an access count of `count`
+
+        New keys start at 1, which is found at the head in O(1); larger
+        counts (e.g. when restoring saved state) walk the bucket chain.
+        """
+        prev, node = None, self._head
+        while node is not None and node.count < count:
+            prev, node = node, node.next
+        if node is None or node.count != count:
+            node = self._link(count, prev, node)
+        node.keys[key] = None
+        self._nodes[key] = node
+
+    def bump(self, key):
+        """Increments the access count of a tracked `key`"""
+        node = self._nodes[key]
+        count = node.count + 1
+        after = node.next
+        if after is None or after.count != count:
+            after = self._link(count, node, after)
+        del node.keys[key]
+        after.keys[key] = None
+        self._nodes[key] = after
+        if not node.keys:
+            self._unlink(node)
+
+    def discard(self, key):
+        """Stops tracking `key` if it is tracked"""
+        node = self._nodes.pop(key, None)
+        if node is not None:
+            del node.keys[key]
+            if not node.keys:
+                self._unlink(node)
+
+    def pop_least(self):
+        """Removes and returns the least frequently, least recently used key
+        """
+        node = self._head
+        key = node.keys.popitem(last=False)[0]
+        del self._nodes[key]
+        if not node.keys:
+            self._unlink(node)
+        return key
+
+    def _buckets(self):
+        """Yields the buckets from the lowest count to the highest"""
+        node = self._head
+        while node is not None:
+            yield node
+            node = node.next
+
+    def _link(self, count, prev, next):
+        """Inserts and returns a new bucket between `prev` and `next`"""
+        node = _FrequencyNode(count, prev, next)
+        if prev is None:
+            self._head = node
+        else:
+            prev.next = node
+        if next is not None:
+            next.prev = node
+        return node
+
+    def _unlink(self, node):
+        """Removes an empty bucket from the chain"""
+        if node.prev is None:
+            self._head = node.next
+        else:
+            node.prev.next = node.next
+        if node.next is not None:
+            node.next.prev = node.prev
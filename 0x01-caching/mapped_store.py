@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+""" Memory-mapped value store for the caches """
+import mmap
+import os
+import pickle
+from collections.abc import MutableMapping
+
+
+class MappedStore(MutableMapping):
+    """Dictionary keeping its values pickled in a memory-mapped file
+
+    Used as the `cache_data` of a cache (`BaseCaching(store=...)`), it
+    moves the items out of the Python heap: only the keys and an
+    `(offset, length)` pair per key stay in memory. Values are appended
+    to the file; the space of replaced or deleted values is reclaimed by
+    compacting the file once it outweighs the live data.
+
+    `flush` writes the index next to the file (`<path>.idx`), so the
+    store of a restarted process reopens without reading any value.
+    """
+    INITIAL_SIZE = 1 << 20
+
+    def __init__(self, path):
+        """Opens, or creates, the store backed by the file at `path`"""
+        self.path = path
+        self.index_path = "{}.idx".format(path)
+        self._index = {}
+        self._end = 0
+        self._garbage = 0
+        mode = "r+b" if os.path.exists(path) else "w+b"
+        self._file = open(path, mode)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                self._end, self._index = pickle.load(f)
+            self._garbage = self._end - sum(
+                length for _, length in self._index.values())
+        size = max(os.fstat(self._file.fileno()).st_size,
+                   self.INITIAL_SIZE, self._end)
+        self._map = None
+        self._remap(size)
+
+    def __getitem__(self, key):
+        """Returns the unpickled value of `key`"""
+        offset, length = self._index[key]
+        return pickle.loads(self._map[offset:offset + length])
+
+    def __setitem__(self, key, value):
+        """Appends the pickled value of `key` to the file"""
+        data = pickle.dumps(value, protocol=5)
+        old = self._index.get(key)
+        if old is not None:
+            self._garbage += old[1]
+        if self._end + len(data) > len(self._map):
+            self._compact()
+            if self._end + len(data) > len(self._map):
+                self._remap(max(2 * len(self._map), self._end + len(data)))
+        self._map[self._end:self._end + len(data)] = data
+        self._index[key] = (self._end, len(data))
+        self._end += len(data)
+
+    def __delitem__(self, key):
+        """Forgets `key`; its bytes are reclaimed by the next compaction"""
+        self._garbage += self._index.pop(key)[1]
+
+    def __contains__(self, key):
+        """Checks whether `key` is stored, without reading its value"""
+        return key in self._index
+
+    def __iter__(self):
+        """Iterates over the keys"""
+        return iter(self._index)
+
+    def __len__(self):
+        """Returns the number of stored keys"""
+        return len(self._index)
+
+    def clear(self):
+        """Forgets every key at once"""
+        self._index.clear()
+        self._end = 0
+        self._garbage = 0
+
+    def flush(self):
+        """Writes the mapped pages and the index to disk"""
+        self._map.flush()
+        tmp = "{}.tmp".format(self.index_path)
+        with open(tmp, "wb") as f:
+            pickle.dump((self._end, self._index), f, protocol=5)
+        os.replace(tmp, self.index_path)
+
+    def close(self):
+        """Flushes, then releases the mapping and the file"""
+        self.flush()
+        self._map.close()
+        self._file.close()
+
+    def _remap(self, size):
+        """Grows the file to `size` bytes and maps it again"""
+        if self._map is not None:
+            self._map.close()
+        if os.fstat(self._file.fileno()).st_size < size:
+            self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+
+    def _compact(self):
+        """Moves the live values to the front of the file.
+
+        Runs only when at least half of the used bytes are garbage, so its
+        cost is amortized over the writes that produced the garbage.
+        """
+        if self._garbage * 2 < self._end:
+            return
+        end = 0
+        for key, (offset, length) in sorted(self._index.items(),
+                                            key=lambda entry: entry[1][0]):
+            if offset != end:
+                self._map.move(end, offset, length)
+                self._index[key] = (end, length)
+            end += length
+        self._end = end
+        self._garbage = 0
@@ -0,0 +1,153 @@
+#!/usr/bin/python3
+""" Memoization backed by the caching policies """
+import asyncio
+import functools
+import inspect
+import threading
+
+LRUCache = __import__('3-lru_cache').LRUCache
+
+
+def make_key(args, kwargs):
+    """Builds the cache key of a call from its arguments
+
+    Keyword arguments are sorted, so their order does not matter. The key
+    is a non-empty tuple, hence always accepted by `BaseCaching.put`.
+
+    Raises:
+        TypeError: If an argument is not hashable.
+    """
+    key = (args, tuple(sorted(kwargs.items()))) if kwargs else (args,)
+    hash(key)
+    return key
+
+
+class _Call():
+    """Result of a computation shared by concurrent callers"""
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        """Initializes a pending call"""
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+def _consume(future):
+    """Marks the exception of an unawaited future as retrieved"""
+    if not future.cancelled():
+        future.exception()
+
+
+def cached(policy=LRUCache, max_items=128, ttl=None, key=make_key,
+           **kwargs):
+    """Memoizes a function in a cache of the given policy
+
+    Args:
+        policy (type): The `BaseCaching` subclass storing the results.
+        max_items (int): Entry budget of the cache.
+        ttl (float): Time-to-live of the results, in seconds. Defaults to
+            results that never expire.
+        key (callable): Builds the cache key from `(args, kwargs)`.
+        **kwargs: Other options of the cache (see `BaseCaching`).
+
+    Concurrent calls with the same key are deduplicated: one caller
+    computes the result while the others wait for it, and an exception
+    is raised to all of them without being cached. Coroutine functions
+    get an `async` wrapper doing the same with futures.
+
+    The wrapper exposes its cache as `cache`.
+
+    Example:
+        @cached(policy=LFUCache, max_items=10000, ttl=60)
+        def lookup(name):
+            ...
+    """
+    kwargs.setdefault('thread_safe', True)
+
+    def decorator(func):
+        """Wraps `func` with a memoizing wrapper"""
+        cache = policy(max_items=max_items, ttl=ttl, **kwargs)
+        if inspect.iscoroutinefunction(func):
+            wrapper = _async_wrapper(func, cache, key)
+        else:
+            wrapper = _sync_wrapper(func, cache, key)
+        wrapper.cache = cache
+        return functools.wraps(func)(wrapper)
+
+    return decorator
+
+
+def _sync_wrapper(func, cache, key):
+    """Returns the memoizing wrapper of a plain function"""
+    calls = {}
+    lock = threading.Lock()
+
+    def wrapper(*args, **kwargs):
+        """Returns the cached result, computing it once if missing"""
+        call_key = key(args, kwargs)
+        hit = cache.get(call_key)
+        if hit is not None:
+            return hit[0]
+        with lock:
+            call = calls.get(call_key)
+            leader = call is None
+            if leader:
+                # The leader of a call that just ended has cached its
+                # result and forgotten the call.
+                hit = cache.get(call_key)
+                if hit is not None:
+                    return hit[0]
+                call = calls[call_key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+        try:
+            call.value = func(*args, **kwargs)
+            cache.put(call_key, (call.value,))
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with lock:
+                del calls[call_key]
+            call.done.set()
+        return call.value
+
+    return wrapper
+
+
+def _async_wrapper(func, cache, key):
+    """Returns the memoizing wrapper of a coroutine function"""
+    calls = {}
+
+    async def wrapper(*args, **kwargs):
+        """Returns the cached result, awaiting it once if missing"""
+        call_key = key(args, kwargs)
+        hit = cache.get(call_key)
+        if hit is not None:
+            return hit[0]
+        future = calls.get(call_key)
+        if future is not None:
+            return await asyncio.shield(future)
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume)
+        calls[call_key] = future
+        try:
+            value = await func(*args, **kwargs)
+            cache.put(call_key, (value,))
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            del calls[call_key]
+        return value
+
+    return wrapper
@@ -0,0 +1,213 @@
+#!/usr/bin/python3
+""" Minimal pooled, pipelining client for Redis-protocol servers """
+import math
+import socket
+import threading
+from contextlib import contextmanager
+
+
+class RespError(Exception):
+    """Error reply sent by the server"""
+
+
+def encode(*commands):
+    """Encodes commands, each a sequence of arguments, as RESP arrays"""
+    parts = []
+    for command in commands:
+        parts.append(b"*%d\r\n" % len(command))
+        for arg in command:
+            if isinstance(arg, str):
+                arg = arg.encode()
+            elif isinstance(arg, int):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+def read_reply(reader):
+    """Reads one RESP reply from a binary file-like `reader`
+
+    Error replies are returned as `RespError` instances, not raised, so
+    that one failed command of a pipeline does not hide the others.
+    """
+    line = reader.readline()
+    if not line:
+        raise ConnectionError("connection closed by the server")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode()
+    if kind == b"-":
+        return RespError(body.decode())
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = reader.read(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        length = int(body)
+        if length < 0:
+            return None
+        return [read_reply(reader) for _ in range(length)]
+    raise ConnectionError("bad reply line: {!r}".format(line))
+
+
+class Connection():
+    """One socket to the server, sending pipelined commands"""
+    def __init__(self, host, port, timeout=None):
+        """Opens the socket"""
+        self.sock = socket.create_connection((host, port), timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+
+    def pipeline(self, commands):
+        """Sends every command in one write, then reads all the replies"""
+        self.sock.sendall(encode(*commands))
+        return [read_reply(self.reader) for _ in commands]
+
+    def close(self):
+        """Closes the socket"""
+        self.reader.close()
+        self.sock.close()
+
+
+class ConnectionPool():
+    """Bounded pool of reusable connections
+
+    Idle connections are reused most recently released first. When
+    `size` connections are in use, callers wait for one to be released.
+    A connection that failed while in use is closed instead of being
+    returned to the pool.
+    """
+    def __init__(self, host="localhost", port=6379, size=8, timeout=None):
+        """Initializes an empty pool of at most `size` connections"""
+        self.host = host
+        self.port = port
+        self.size = size
+        self.timeout = timeout
+        self._idle = []
+        self._open = 0
+        self._available = threading.Condition()
+
+    @contextmanager
+    def connection(self):
+        """Lends a connection for the duration of a `with` block"""
+        with self._available:
+            while not self._idle and self._open >= self.size:
+                self._available.wait()
+            if self._idle:
+                conn = self._idle.pop()
+            else:
+                conn = None
+                self._open += 1
+        try:
+            if conn is None:
+                conn = Connection(self.host, self.port, self.timeout)
+            yield conn
+        except BaseException:
+            if conn is not None:
+                conn.close()
+            with self._available:
+                self._open -= 1
+                self._available.notify()
+            raise
+        with self._available:
+            self._idle.append(conn)
+            self._available.notify()
+
+    def close(self):
+        """Closes the idle connections"""
+        with self._available:
+            while self._idle:
+                self._idle.pop().close()
+                self._open -= 1
+
+
+class RespClient():
+    """Client for the Redis commands used by the caches"""
+    def __init__(self, host="localhost", port=6379, pool_size=8,
+                 timeout=None):
+        """Initializes the client and its `ConnectionPool`"""
+        self.pool = ConnectionPool(host, port, pool_size, timeout)
+
+    def pipeline(self, commands):
+        """Runs several commands in one round trip, returns their replies
+
+        Error replies are returned as `RespError` instances.
+        """
+        if not commands:
+            return []
+        with self.pool.connection() as conn:
+            return conn.pipeline(commands)
+
+    def execute(self, *args):
+        """Runs one command, returns its reply
+
+        Raises:
+            RespError: If the server replied with an error.
+        """
+        reply = self.pipeline([args])[0]
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    def get(self, key):
+        """Returns the value of `key` as bytes, or None"""
+        return self.execute("GET", key)
+
+    def set(self, key, value, ex=None):
+        """Sets `key`, expiring after `ex` seconds if given"""
+        if ex is None:
+            return self.execute("SET", key, value)
+        return self.execute("SET", key, value, "PX",
+                            max(1, math.ceil(ex * 1000)))
+
+    def mget(self, keys):
+        """Returns the values of `keys`, None for the missing ones"""
+        if not keys:
+            return []
+        return self.execute("MGET", *keys)
+
+    def delete(self, *keys):
+        """Deletes `keys`, returns how many existed"""
+        return self.execute("DEL", *keys)
+
+    def publish(self, channel, message):
+        """Publishes `message` on `channel`"""
+        return self.execute("PUBLISH", channel, message)
+
+    def subscribe(self, channel):
+        """Returns a `Subscription` to `channel` on its own connection"""
+        return Subscription(self.pool.host, self.pool.port, channel)
+
+    def close(self):
+        """Closes the idle pooled connections"""
+        self.pool.close()
+
+
+class Subscription():
+    """Dedicated connection receiving the messages of one channel"""
+    def __init__(self, host, port, channel):
+        """Opens the connection and subscribes to `channel`"""
+        self.conn = Connection(host, port)
+        self.conn.pipeline([("SUBSCRIBE", channel)])
+
+    def __iter__(self):
+        """Yields the payload of every message, until `close`"""
+        while True:
+            try:
+                reply = read_reply(self.conn.reader)
+            except (ConnectionError, OSError, ValueError):
+                return
+            if isinstance(reply, list) and reply[0] == b"message":
+                yield reply[2]
+
+    def close(self):
+        """Unblocks the iteration and closes the connection"""
+        try:
+            self.conn.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.conn.close()
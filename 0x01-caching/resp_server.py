@@ -0,0 +1,189 @@
+#!/usr/bin/python3
+""" In-process stand-in for a Redis server
+
+Usage: ./resp_server.py [port]
+
+Speaks enough of the Redis protocol for the tiered cache and its tests:
+PING, GET, SET (with EX/PX), MGET, DEL, EXISTS, FLUSHDB, PUBLISH and
+SUBSCRIBE. Data lives in one dictionary guarded by a lock.
+"""
+import socketserver
+import sys
+import threading
+import time
+
+read_reply = __import__('resp_client').read_reply
+encode = __import__('resp_client').encode
+
+
+def _bulk(value):
+    """Encodes a bulk string reply, or a null one for None"""
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Serves the commands of one client connection"""
+    def handle(self):
+        """Answers commands until the client disconnects"""
+        while True:
+            try:
+                command = read_reply(self.rfile)
+            except (ConnectionError, OSError):
+                return
+            if not isinstance(command, list) or not command:
+                return
+            name = command[0].decode().upper()
+            args = command[1:]
+            method = getattr(self.server, "cmd_" + name.lower(), None)
+            if method is None:
+                reply = b"-ERR unknown command '%s'\r\n" % name.encode()
+            elif name == "SUBSCRIBE":
+                method(self, args)
+                return
+            else:
+                try:
+                    reply = method(*args)
+                except (TypeError, ValueError) as error:
+                    reply = b"-ERR %s\r\n" % str(error).encode()
+            try:
+                self.wfile.write(reply)
+            except OSError:
+                return
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+    """Threaded Redis stand-in bound to `host`:`port` (0 picks a port)"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        """Binds the server; call `start` to serve from a thread"""
+        super().__init__((host, port), _Handler)
+        self.port = self.server_address[1]
+        self.data = {}
+        self.expires = {}
+        self.subscribers = {}
+        self.lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Serves from a daemon thread, returns the server"""
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops serving and closes the listening socket"""
+        self.shutdown()
+        self.server_close()
+
+    def _live(self, key):
+        """Returns the value of `key`, dropping it if expired"""
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.data.pop(key, None)
+            del self.expires[key]
+        return self.data.get(key)
+
+    def cmd_ping(self, *args):
+        """PING"""
+        return b"+PONG\r\n"
+
+    def cmd_get(self, key):
+        """GET key"""
+        with self.lock:
+            return _bulk(self._live(key))
+
+    def cmd_set(self, key, value, *options):
+        """SET key value [EX seconds | PX milliseconds]"""
+        deadline = None
+        if options:
+            unit = options[0].upper()
+            if unit not in (b"EX", b"PX") or len(options) != 2:
+                raise ValueError("syntax error")
+            scale = 1 if unit == b"EX" else 0.001
+            amount = int(options[1])
+            if amount <= 0:
+                raise ValueError("invalid expire time in 'set' command")
+            deadline = time.monotonic() + amount * scale
+        with self.lock:
+            self.data[key] = value
+            if deadline is None:
+                self.expires.pop(key, None)
+            else:
+                self.expires[key] = deadline
+        return b"+OK\r\n"
+
+    def cmd_mget(self, *keys):
+        """MGET key [key ...]"""
+        with self.lock:
+            values = [self._live(key) for key in keys]
+        return b"*%d\r\n" % len(values) + b"".join(map(_bulk, values))
+
+    def cmd_del(self, *keys):
+        """DEL key [key ...]"""
+        with self.lock:
+            removed = 0
+            for key in keys:
+                if self._live(key) is not None:
+                    del self.data[key]
+                    self.expires.pop(key, None)
+                    removed += 1
+        return b":%d\r\n" % removed
+
+    def cmd_exists(self, *keys):
+        """EXISTS key [key ...]"""
+        with self.lock:
+            count = sum(self._live(key) is not None for key in keys)
+        return b":%d\r\n" % count
+
+    def cmd_flushdb(self):
+        """FLUSHDB"""
+        with self.lock:
+            self.data.clear()
+            self.expires.clear()
+        return b"+OK\r\n"
+
+    def cmd_publish(self, channel, message):
+        """PUBLISH channel message"""
+        payload = encode((b"message", channel, message))
+        with self.lock:
+            handlers = list(self.subscribers.get(channel, ()))
+        delivered = 0
+        for handler in handlers:
+            try:
+                with handler.write_lock:
+                    handler.wfile.write(payload)
+                delivered += 1
+            except OSError:
+                pass
+        return b":%d\r\n" % delivered
+
+    def cmd_subscribe(self, handler, channels):
+        """SUBSCRIBE channel [channel ...], then holds the connection"""
+        handler.write_lock = threading.Lock()
+        with handler.write_lock:
+            with self.lock:
+                for channel in channels:
+                    self.subscribers.setdefault(channel, []).append(handler)
+            for count, channel in enumerate(channels, 1):
+                handler.wfile.write(b"*3\r\n" + _bulk(b"subscribe") +
+                                    _bulk(channel) + b":%d\r\n" % count)
+        try:
+            while handler.rfile.read(1):
+                pass
+        except OSError:
+            pass
+        with self.lock:
+            for channel in channels:
+                self.subscribers[channel].remove(handler)
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 6379
+    server = RespServer(port=port)
+    print("listening on 127.0.0.1:{}".format(server.port))
+    server.serve_forever()
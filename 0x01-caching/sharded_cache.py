@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+""" Lock-striped caching """
+
+
+class ShardedCache():
+    """Spreads keys over independent, individually locked caches
+
+    Each key is hashed to one of `shards` sub-caches of the same policy,
+    so threads working on different shards never wait on the same lock.
+    The entry and byte budgets are split evenly between the shards
+    (rounded up), and each shard applies its policy on its own share.
+    """
+    def __init__(self, policy, shards=8, max_items=None, max_bytes=None,
+                 **kwargs):
+        """Initializes the ShardedCache instance.
+
+        Args:
+            policy (type): The `BaseCaching` subclass used by every shard.
+            shards (int): Number of sub-caches, each with its own lock.
+            max_items (int): Total entry budget, split between the shards.
+                Defaults to `shards` times the policy's `MAX_ITEMS`.
+            max_bytes (int): Total byte budget, split between the shards.
+            **kwargs: Other options passed to every shard.
+        """
+        if shards < 1:
+            raise ValueError("shards must be a positive integer")
+        if max_items is not None:
+            max_items = -(-max_items // shards)
+        if max_bytes is not None:
+            max_bytes = -(-max_bytes // shards)
+        kwargs['thread_safe'] = True
+        self.shards = [policy(max_items=max_items, max_bytes=max_bytes,
+                              **kwargs) for _ in range(shards)]
+
+    def shard(self, key):
+        """Returns the sub-cache responsible for `key`"""
+        return self.shards[hash(key) % len(self.shards)]
+
+    def put(self, key, item, ttl=None):
+        """Stores an item in the shard of `key`, see `BaseCaching.put`"""
+        if key and item:
+            self.shard(key).put(key, item, ttl)
+
+    def get(self, key):
+        """Retrieves an item from the shard of `key`, or None"""
+        if key:
+            return self.shard(key).get(key)
+        return None
+
+    def put_many(self, items, ttl=None):
+        """Stores several items, as one batch per shard"""
+        if hasattr(items, 'items'):
+            items = items.items()
+        batches = {}
+        for key, item in items:
+            if key and item:
+                batches.setdefault(self.shard(key), []).append((key, item))
+        for shard, batch in batches.items():
+            shard.put_many(batch, ttl)
+
+    def get_many(self, keys):
+        """Retrieves the items of several keys, one batch per shard"""
+        batches = {}
+        for key in keys:
+            if key:
+                batches.setdefault(self.shard(key), []).append(key)
+        found = {}
+        for shard, batch in batches.items():
+            found.update(shard.get_many(batch))
+        return found
+
+    def delete(self, key):
+        """Removes an item from the shard of `key`, see `BaseCaching.delete`
+        """
+        return self.shard(key).delete(key)
+
+    def clear(self):
+        """Removes every item from every shard"""
+        for shard in self.shards:
+            shard.clear()
+
+    def __contains__(self, key):
+        """Checks whether the shard of `key` holds an unexpired item"""
+        return key in self.shard(key)
+
+    def __len__(self):
+        """Returns the number of entries of every shard"""
+        return sum(len(shard) for shard in self.shards)
+
+    def sweep(self):
+        """Reclaims the expired entries of every shard, returns their count
+        """
+        return sum(shard.sweep() for shard in self.shards)
+
+    def start_sweeper(self, interval=1.0):
+        """Starts the background sweeper of every shard"""
+        for shard in self.shards:
+            shard.start_sweeper(interval)
+
+    def stop_sweeper(self):
+        """Stops the background sweeper of every shard"""
+        for shard in self.shards:
+            shard.stop_sweeper()
+
+    @property
+    def current_bytes(self):
+        """Total tracked size of the items of every shard"""
+        return sum(shard.current_bytes for shard in self.shards)
+
+    def stats(self):
+        """Returns the counters of every shard added together
+
+        The keys are the same as in `BaseCaching.stats`; `hit_ratio` is
+        computed over the summed hits and misses.
+        """
+        total = {}
+        for shard in self.shards:
+            for name, value in shard.stats().items():
+                total[name] = total.get(name, 0) + value
+        gets = total["hits"] + total["misses"]
+        total["hit_ratio"] = total["hits"] / gets if gets else 0.0
+        return total
+
+    def print_cache(self):
+        """Prints the content of every shard, sorted by key"""
+        cache_data = {}
+        for shard in self.shards:
+            with shard.lock:
+                cache_data.update(shard.cache_data)
+        print("Current cache:")
+        for key in sorted(cache_data.keys()):
+            print("{}: {}".format(key, cache_data.get(key)))
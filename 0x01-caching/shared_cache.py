@@ -0,0 +1,463 @@
+#!/usr/bin/python3
+""" Caches shared by the processes of a machine """
+import multiprocessing
+import pickle
+import struct
+import zlib
+from multiprocessing import shared_memory
+
+
+class SharedCache():
+    """Fixed-size cache living in shared memory
+
+    The whole cache sits in one `SharedMemory` block: a header with the
+    eviction order ends and the shared counters, a hash table of slot
+    numbers, and `max_items` fixed-size slots. Each slot holds its links
+    in the eviction order and in its hash chain, a generation number,
+    the pickled key (at most `max_key_size` bytes) and the pickled item
+    (at most `max_value_size` bytes).
+
+    Create the cache in the parent process before starting the workers:
+    forked workers inherit it, and spawned ones receive it as an
+    argument of their `Process`, which must come from the `context` the
+    cache was created with. Every process then reads and writes the
+    same entries, so a value computed by one worker is a hit for all.
+
+    Locking is striped. Reads only take the lock of their hash chain,
+    so reads of different chains run in parallel. Writes and reordering
+    also take the order lock, which serializes them. Keys are compared
+    by their pickled bytes, so `1` and `1.0` are different keys.
+
+    Subclasses pick the policy through `_touch`, called after a hit.
+    """
+    HEADER = struct.Struct("<qqqqqq")
+    COUNTERS = struct.Struct("<qq")
+    SLOT = struct.Struct("<iiiIIII")
+    NIL = -1
+
+    def __init__(self, max_items=4, max_key_size=64, max_value_size=1024,
+                 locks=16, verbose=False, context=None):
+        """Initializes an empty cache in a new shared memory block
+
+        Args:
+            max_items (int): Number of slots of the cache.
+            max_key_size (int): Maximum size of a pickled key, in bytes.
+            max_value_size (int): Maximum size of a pickled item, in
+                bytes.
+            locks (int): Number of lock stripes over the hash chains.
+            verbose (bool): Whether evictions print `DISCARD: <key>`.
+            context: The `multiprocessing` context creating the locks,
+                which must be the one starting the processes sharing the
+                cache. Defaults to `multiprocessing.get_context()`.
+        """
+        if max_items < 1:
+            raise ValueError("max_items must be a positive integer")
+        self.max_items = max_items
+        self.max_key_size = max_key_size
+        self.max_value_size = max_value_size
+        self.verbose = verbose
+        self.buckets = 1
+        while self.buckets < 2 * max_items:
+            self.buckets *= 2
+        record_size = self.SLOT.size + max_key_size + max_value_size
+        self.slot_size = -(-record_size // 8) * 8
+        self.counters_offset = self.HEADER.size
+        self.buckets_offset = self.counters_offset + \
+            self.COUNTERS.size * locks
+        self.slots_offset = -(-(self.buckets_offset + 4 * self.buckets)
+                              // 8) * 8
+        size = self.slots_offset + self.slot_size * max_items
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        if context is None:
+            context = multiprocessing.get_context()
+        self.order_lock = context.Lock()
+        self.stripes = [context.Lock() for _ in range(locks)]
+        self._format()
+
+    def put(self, key, item):
+        """ Add an item in the cache
+
+        If `key` or `item` is missing, nothing is stored. A full cache
+        evicts the entry picked by its policy first.
+
+        Raises:
+            ValueError: If the pickled key or item does not fit a slot.
+        """
+        if not key or not item:
+            return
+        data = self._encode(key)
+        value = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        if len(value) > self.max_value_size:
+            raise ValueError("item too large: {} bytes".format(len(value)))
+        code = zlib.crc32(data)
+        bucket = code & (self.buckets - 1)
+        stripe = self.stripes[bucket % len(self.stripes)]
+        with self.order_lock:
+            with stripe:
+                slot = self._find(bucket, code, data)
+                if slot != self.NIL:
+                    self._write_value(slot, value)
+                    self._move_to_end(slot)
+                    self._count_put()
+                    return
+            if self._header()[3] >= self.max_items:
+                self._evict()
+            with stripe:
+                self._insert(bucket, code, data, value)
+
+    def get(self, key):
+        """ Get an item by key
+
+        Returns:
+            The item stored under `key`, or None.
+        """
+        if key is None:
+            return None
+        data = self._encode(key, strict=False)
+        if data is None:
+            return None
+        code = zlib.crc32(data)
+        bucket = code & (self.buckets - 1)
+        index = bucket % len(self.stripes)
+        with self.stripes[index]:
+            slot = self._find(bucket, code, data)
+            if slot == self.NIL:
+                self._count(index, 0, 1)
+                return None
+            meta = self._meta(slot)
+            start = self._slot_offset(slot) + self.SLOT.size + \
+                self.max_key_size
+            value = bytes(self.shm.buf[start:start + meta[6]])
+            self._count(index, 1, 0)
+        self._touch(slot, meta[3])
+        return pickle.loads(value)
+
+    def delete(self, key):
+        """ Remove `key` from the cache
+
+        Returns:
+            bool: Whether `key` was stored.
+        """
+        data = self._encode(key, strict=False)
+        if data is None:
+            return False
+        code = zlib.crc32(data)
+        bucket = code & (self.buckets - 1)
+        with self.order_lock:
+            with self.stripes[bucket % len(self.stripes)]:
+                slot = self._find(bucket, code, data)
+                if slot == self.NIL:
+                    return False
+                self._remove(slot)
+        return True
+
+    def __contains__(self, key):
+        """ Check whether `key` is stored, without touching it
+        """
+        data = self._encode(key, strict=False)
+        if data is None:
+            return False
+        code = zlib.crc32(data)
+        bucket = code & (self.buckets - 1)
+        with self.stripes[bucket % len(self.stripes)]:
+            return self._find(bucket, code, data) != self.NIL
+
+    def __len__(self):
+        """ Number of entries of the cache
+        """
+        return self._header()[3]
+
+    def keys(self):
+        """ Keys of the cache, from the next evicted to the last one
+        """
+        with self.order_lock:
+            keys = []
+            slot = self._header()[0]
+            while slot != self.NIL:
+                keys.append(self._key(slot))
+                slot = self._meta(slot)[1]
+        return keys
+
+    def clear(self):
+        """ Remove every item from the cache, keeping the counters
+        """
+        with self.order_lock:
+            for stripe in self.stripes:
+                stripe.acquire()
+            try:
+                self._format(keep_counters=True)
+            finally:
+                for stripe in self.stripes:
+                    stripe.release()
+
+    def print_cache(self):
+        """ Print the cache
+        """
+        with self.order_lock:
+            items = []
+            slot = self._header()[0]
+            while slot != self.NIL:
+                meta = self._meta(slot)
+                start = self._slot_offset(slot) + self.SLOT.size + \
+                    self.max_key_size
+                items.append((self._key(slot), pickle.loads(
+                    self.shm.buf[start:start + meta[6]])))
+                slot = meta[1]
+        print("Current cache:")
+        for key, item in sorted(items):
+            print("{}: {}".format(key, item))
+
+    def stats(self):
+        """ Snapshot of the counters shared by every process
+
+        Returns:
+            dict: `hits`, `misses`, `puts`, `evictions`, `size` and
+            `hit_ratio` (hits over gets, 0.0 before the first get).
+        """
+        hits = misses = 0
+        for index in range(len(self.stripes)):
+            stripe_hits, stripe_misses = self.COUNTERS.unpack_from(
+                self.shm.buf, self.counters_offset +
+                index * self.COUNTERS.size)
+            hits += stripe_hits
+            misses += stripe_misses
+        header = self._header()
+        gets = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "puts": header[4],
+            "evictions": header[5],
+            "size": header[3],
+            "hit_ratio": hits / gets if gets else 0.0
+        }
+
+    def close(self):
+        """ Detach this process from the shared memory block
+        """
+        self.shm.close()
+
+    def unlink(self):
+        """ Destroy the shared memory block, once every process closed it
+        """
+        self.shm.unlink()
+
+    def _touch(self, slot, generation):
+        """Updates the order after a hit on `slot`, if still the same"""
+
+    def _format(self, keep_counters=False):
+        """Empties the table, chaining every slot in the free list"""
+        buf = self.shm.buf
+        puts = evictions = 0
+        if keep_counters:
+            puts, evictions = self._header()[4:]
+        else:
+            end = self.buckets_offset
+            buf[self.counters_offset:end] = bytes(end - self.counters_offset)
+        end = self.buckets_offset + 4 * self.buckets
+        buf[self.buckets_offset:end] = b"\xff" * (end - self.buckets_offset)
+        for slot in range(self.max_items):
+            following = slot + 1 if slot + 1 < self.max_items else self.NIL
+            generation = self._meta(slot)[3] + 1 if keep_counters else 0
+            self.SLOT.pack_into(buf, self._slot_offset(slot), self.NIL,
+                                following, self.NIL, generation, 0, 0, 0)
+        self.HEADER.pack_into(buf, 0, self.NIL, self.NIL, 0, 0, puts,
+                              evictions)
+
+    def _encode(self, key, strict=True):
+        """Returns the pickled key
+
+        Raises:
+            ValueError: If it does not fit a slot and `strict` is set;
+                None is returned otherwise.
+        """
+        data = pickle.dumps(key, 4)
+        if len(data) > self.max_key_size:
+            if strict:
+                raise ValueError("key too large: {} bytes".format(len(data)))
+            return None
+        return data
+
+    def _header(self):
+        """Returns head, tail, free, count, puts and evictions"""
+        return self.HEADER.unpack_from(self.shm.buf, 0)
+
+    def _set_header(self, head, tail, free, count, puts, evictions):
+        """Writes the header"""
+        self.HEADER.pack_into(self.shm.buf, 0, head, tail, free, count,
+                              puts, evictions)
+
+    def _slot_offset(self, slot):
+        """Returns where `slot` starts in the block"""
+        return self.slots_offset + slot * self.slot_size
+
+    def _meta(self, slot):
+        """Returns prev, next, chain, generation, hash, key and item
+        lengths of `slot`"""
+        return self.SLOT.unpack_from(self.shm.buf, self._slot_offset(slot))
+
+    def _set_meta(self, slot, *meta):
+        """Writes the metadata of `slot`"""
+        self.SLOT.pack_into(self.shm.buf, self._slot_offset(slot), *meta)
+
+    def _bucket(self, bucket):
+        """Returns the first slot of a hash chain"""
+        return struct.unpack_from("<i", self.shm.buf,
+                                  self.buckets_offset + 4 * bucket)[0]
+
+    def _set_bucket(self, bucket, slot):
+        """Makes `slot` the first of a hash chain"""
+        struct.pack_into("<i", self.shm.buf,
+                         self.buckets_offset + 4 * bucket, slot)
+
+    def _key(self, slot):
+        """Returns the key stored in `slot`"""
+        meta = self._meta(slot)
+        start = self._slot_offset(slot) + self.SLOT.size
+        return pickle.loads(self.shm.buf[start:start + meta[5]])
+
+    def _find(self, bucket, code, data):
+        """Returns the slot holding the pickled key `data`, or NIL"""
+        buf = self.shm.buf
+        slot = self._bucket(bucket)
+        while slot != self.NIL:
+            meta = self._meta(slot)
+            if meta[4] == code and meta[5] == len(data):
+                start = self._slot_offset(slot) + self.SLOT.size
+                if buf[start:start + len(data)] == data:
+                    return slot
+            slot = meta[2]
+        return self.NIL
+
+    def _write_value(self, slot, value):
+        """Replaces the item of `slot`"""
+        meta = list(self._meta(slot))
+        meta[6] = len(value)
+        start = self._slot_offset(slot) + self.SLOT.size + self.max_key_size
+        self.shm.buf[start:start + len(value)] = value
+        self._set_meta(slot, *meta)
+
+    def _insert(self, bucket, code, data, value):
+        """Stores a new entry in a free slot, at the end of the order"""
+        head, tail, free, count, puts, evictions = self._header()
+        slot = free
+        generation = self._meta(slot)[3]
+        free = self._meta(slot)[1]
+        start = self._slot_offset(slot) + self.SLOT.size
+        self.shm.buf[start:start + len(data)] = data
+        start += self.max_key_size
+        self.shm.buf[start:start + len(value)] = value
+        self._set_meta(slot, tail, self.NIL, self._bucket(bucket),
+                       generation, code, len(data), len(value))
+        self._set_bucket(bucket, slot)
+        if tail == self.NIL:
+            head = slot
+        else:
+            meta = list(self._meta(tail))
+            meta[1] = slot
+            self._set_meta(tail, *meta)
+        self._set_header(head, slot, free, count + 1, puts + 1, evictions)
+
+    def _evict(self):
+        """Removes the first entry of the order, under the order lock"""
+        slot = self._header()[0]
+        code = self._meta(slot)[4]
+        bucket = code & (self.buckets - 1)
+        with self.stripes[bucket % len(self.stripes)]:
+            key = self._key(slot) if self.verbose else None
+            self._remove(slot)
+        head, tail, free, count, puts, evictions = self._header()
+        self._set_header(head, tail, free, count, puts, evictions + 1)
+        if self.verbose:
+            print("DISCARD: {}".format(key))
+
+    def _remove(self, slot):
+        """Unlinks `slot` from its chain and the order, then frees it"""
+        prev, following, chain, generation, code, _, _ = self._meta(slot)
+        bucket = code & (self.buckets - 1)
+        current = self._bucket(bucket)
+        if current == slot:
+            self._set_bucket(bucket, chain)
+        else:
+            while current != self.NIL:
+                meta = list(self._meta(current))
+                if meta[2] == slot:
+                    meta[2] = chain
+                    self._set_meta(current, *meta)
+                    break
+                current = meta[2]
+        head, tail, free, count, puts, evictions = self._header()
+        head, tail = self._unlink(slot, prev, following, head, tail)
+        self._set_meta(slot, self.NIL, free, self.NIL, generation + 1,
+                       0, 0, 0)
+        self._set_header(head, tail, slot, count - 1, puts, evictions)
+
+    def _unlink(self, slot, prev, following, head, tail):
+        """Detaches `slot` from the order, returns the new ends"""
+        if prev == self.NIL:
+            head = following
+        else:
+            meta = list(self._meta(prev))
+            meta[1] = following
+            self._set_meta(prev, *meta)
+        if following == self.NIL:
+            tail = prev
+        else:
+            meta = list(self._meta(following))
+            meta[0] = prev
+            self._set_meta(following, *meta)
+        return head, tail
+
+    def _move_to_end(self, slot):
+        """Makes `slot` the last entry of the order"""
+        head, tail, free, count, puts, evictions = self._header()
+        if slot == tail:
+            return
+        meta = list(self._meta(slot))
+        head, tail = self._unlink(slot, meta[0], meta[1], head, tail)
+        meta[0], meta[1] = tail, self.NIL
+        self._set_meta(slot, *meta)
+        if tail == self.NIL:
+            head = slot
+        else:
+            last = list(self._meta(tail))
+            last[1] = slot
+            self._set_meta(tail, *last)
+        self._set_header(head, slot, free, count, puts, evictions)
+
+    def _count(self, index, hits, misses):
+        """Adds to the counters of a lock stripe, under its lock"""
+        offset = self.counters_offset + index * self.COUNTERS.size
+        old_hits, old_misses = self.COUNTERS.unpack_from(self.shm.buf,
+                                                         offset)
+        self.COUNTERS.pack_into(self.shm.buf, offset, old_hits + hits,
+                                old_misses + misses)
+
+    def _count_put(self):
+        """Counts a put, under the order lock"""
+        head, tail, free, count, puts, evictions = self._header()
+        self._set_header(head, tail, free, count, puts + 1, evictions)
+
+
+class SharedFIFOCache(SharedCache):
+    """Shared cache evicting the oldest entry, like `FIFOCache`
+
+    Storing an item under an existing key moves that key to the newest
+    position; reading it does not change the order, so reads only take
+    the lock of their hash chain.
+    """
+
+
+class SharedLRUCache(SharedCache):
+    """Shared cache evicting the least recently used entry, like
+    `LRUCache`
+
+    A hit moves the entry to the most recently used position, which
+    takes the order lock after the read.
+    """
+    def _touch(self, slot, generation):
+        """Marks a read slot as the most recently used one, unless it
+        was evicted since the read"""
+        with self.order_lock:
+            if self._meta(slot)[3] == generation:
+                self._move_to_end(slot)
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+""" Tests of the budgets of BasicCache """
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+
+BasicCache = __import__('0-basic_cache').BasicCache
+cached = __import__('memoize').cached
+
+
+class TestBasicCacheBudget(unittest.TestCase):
+    """ An over-budget BasicCache refuses puts instead of evicting """
+
+    def test_unbounded_by_default(self):
+        """ Without a budget, every item is kept """
+        cache = BasicCache()
+        for i in range(1, 1001):
+            cache.put(i, i)
+        self.assertEqual(len(cache), 1000)
+
+    def test_max_items_refuses_new_keys(self):
+        """ Keys past `max_items` are refused, older ones stay """
+        cache = BasicCache(max_items=2)
+        cache.put("A", 1)
+        cache.put("B", 2)
+        cache.put("C", 3)
+        self.assertEqual(sorted(cache.cache_data), ["A", "B"])
+        self.assertIsNone(cache.get("C"))
+        self.assertEqual(cache.evictions, 0)
+        cache.put("A", 4)
+        self.assertEqual(cache.get("A"), 4)
+
+    def test_max_bytes_refuses_and_drops_older_value(self):
+        """ An item that does not fit drops the older value of its key """
+        cache = BasicCache(max_bytes=100, sizer=len)
+        cache.put("A", "a" * 60)
+        cache.put("B", "b" * 30)
+        cache.put("C", "c" * 20)
+        self.assertEqual(sorted(cache.cache_data), ["A", "B"])
+        cache.put("B", "b" * 50)
+        self.assertEqual(sorted(cache.cache_data), ["A"])
+        self.assertEqual(cache.current_bytes, 60)
+
+    def test_put_many_refuses_what_does_not_fit(self):
+        """ A batch stores the items that fit, in order """
+        cache = BasicCache(max_items=2)
+        cache.put_many([("A", 1), ("B", 2), ("C", 3)])
+        self.assertEqual(sorted(cache.cache_data), ["A", "B"])
+
+    def test_expired_entries_make_room(self):
+        """ Expired entries are reclaimed before refusing """
+        now = [0.0]
+        cache = BasicCache(max_items=1, ttl=1, clock=lambda: now[0])
+        cache.put("A", 1)
+        now[0] = 2.0
+        cache.put("B", 2)
+        self.assertEqual(list(cache.cache_data), ["B"])
+
+    def test_memoized_past_max_items(self):
+        """ `cached(policy=BasicCache)` keeps working once full """
+        @cached(policy=BasicCache)
+        def double(x):
+            """ Doubles x """
+            return 2 * x
+
+        self.assertEqual([double(i) for i in range(300)],
+                         [2 * i for i in range(300)])
+        self.assertEqual(len(double.cache), 128)
+
+
+if __name__ == '__main__':
+    unittest.main()
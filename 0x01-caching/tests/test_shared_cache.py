@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+""" Tests of the caches shared by the processes of a machine """
+import multiprocessing
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+
+FIFOCache = __import__('1-fifo_cache').FIFOCache
+LRUCache = __import__('3-lru_cache').LRUCache
+SharedCache = __import__('shared_cache').SharedCache
+SharedFIFOCache = __import__('shared_cache').SharedFIFOCache
+SharedLRUCache = __import__('shared_cache').SharedLRUCache
+
+WORKERS = 4
+KEYS = 12
+
+
+def own_keys(cache, worker):
+    """ Puts, reads and deletes keys of its own, exits 1 on a mismatch """
+    keys = ["w{}-{}".format(worker, i) for i in range(KEYS)]
+    for i, key in enumerate(keys):
+        cache.put(key, i + 1)
+    for i, key in enumerate(keys):
+        if cache.get(key) != i + 1:
+            sys.exit(1)
+    for key in keys[::2]:
+        if not cache.delete(key):
+            sys.exit(1)
+    cache.close()
+
+
+def churn(cache, worker):
+    """ Puts, reads and deletes keys shared by every worker """
+    rand = random.Random(worker)
+    for _ in range(500):
+        key = "k{}".format(rand.randrange(3 * cache.max_items))
+        action = rand.random()
+        if action < 0.5:
+            cache.put(key, worker + 1)
+        elif action < 0.8:
+            cache.get(key)
+        else:
+            cache.delete(key)
+    cache.close()
+
+
+def check_structure(test, cache):
+    """ Checks the free list and both directions of the order """
+    head, tail, free, count = cache._header()[:4]
+    free_slots = []
+    while free != SharedCache.NIL:
+        free_slots.append(free)
+        free = cache._meta(free)[1]
+    forward = []
+    slot = head
+    while slot != SharedCache.NIL:
+        forward.append(slot)
+        slot = cache._meta(slot)[1]
+    backward = []
+    slot = tail
+    while slot != SharedCache.NIL:
+        backward.append(slot)
+        slot = cache._meta(slot)[0]
+    test.assertEqual(len(free_slots) + len(cache), cache.max_items)
+    test.assertEqual(count, len(forward))
+    test.assertEqual(forward, backward[::-1])
+    test.assertEqual(set(free_slots) | set(forward),
+                     set(range(cache.max_items)))
+
+
+class TestOrderParity(unittest.TestCase):
+    """ Same evictions as the in-process policies, in one process """
+
+    def replay(self, shared, local):
+        """ Runs the same random operations on both caches """
+        rand = random.Random(0)
+        try:
+            for _ in range(2000):
+                key = "k{}".format(rand.randrange(12))
+                action = rand.random()
+                if action < 0.5:
+                    shared.put(key, key)
+                    local.put(key, key)
+                elif action < 0.9:
+                    self.assertEqual(shared.get(key), local.get(key))
+                else:
+                    shared.delete(key)
+                    local.delete(key)
+                self.assertEqual(shared.keys(), list(local.key_order))
+            self.assertEqual(shared.stats()["evictions"],
+                             local.stats()["evictions"])
+            check_structure(self, shared)
+        finally:
+            shared.close()
+            shared.unlink()
+
+    def test_lru(self):
+        """ SharedLRUCache evicts like LRUCache """
+        self.replay(SharedLRUCache(max_items=5), LRUCache(max_items=5))
+
+    def test_fifo(self):
+        """ SharedFIFOCache evicts like FIFOCache """
+        self.replay(SharedFIFOCache(max_items=5), FIFOCache(max_items=5))
+
+
+class TestProcesses(unittest.TestCase):
+    """ Workers of the fork and spawn contexts sharing one cache """
+
+    def run_workers(self, method, target, max_items):
+        """ Runs `target` in WORKERS processes, returns the cache """
+        context = multiprocessing.get_context(method)
+        cache = SharedLRUCache(max_items=max_items, context=context)
+        self.addCleanup(cache.unlink)
+        self.addCleanup(cache.close)
+        workers = [context.Process(target=target, args=(cache, worker))
+                   for worker in range(WORKERS)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+            self.assertEqual(worker.exitcode, 0)
+        return cache
+
+    def check_own_keys(self, method):
+        """ Every worker sees its own puts and deletes """
+        cache = self.run_workers(method, own_keys, WORKERS * KEYS)
+        for worker in range(WORKERS):
+            for i in range(KEYS):
+                key = "w{}-{}".format(worker, i)
+                self.assertEqual(cache.get(key), None if i % 2 == 0
+                                 else i + 1)
+        self.assertEqual(len(cache), WORKERS * KEYS // 2)
+        self.assertEqual(cache.stats()["evictions"], 0)
+        check_structure(self, cache)
+
+    def check_churn(self, method):
+        """ Concurrent evictions and deletes keep the table consistent """
+        cache = self.run_workers(method, churn, 8)
+        check_structure(self, cache)
+        for key in cache.keys():
+            self.assertIn(cache.get(key), range(1, WORKERS + 1))
+
+    def test_fork(self):
+        """ Forked workers share the cache """
+        self.check_own_keys('fork')
+        self.check_churn('fork')
+
+    def test_spawn(self):
+        """ Spawned workers share the cache """
+        self.check_own_keys('spawn')
+        self.check_churn('spawn')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+""" Tests of TieredCache against the in-process Redis stand-in """
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+
+RespClient = __import__('resp_client').RespClient
+RespServer = __import__('resp_server').RespServer
+TieredCache = __import__('tiered_cache').TieredCache
+
+
+def wait_for(condition, timeout=5):
+    """ Waits until `condition()` is true, returns its last value """
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+class TestTieredCache(unittest.TestCase):
+    """ Two workers sharing one L2 """
+
+    def setUp(self):
+        """ Starts a server and two caches on it """
+        self.server = RespServer().start()
+        self.first = TieredCache(RespClient(port=self.server.port),
+                                 max_items=10)
+        self.second = TieredCache(RespClient(port=self.server.port),
+                                  max_items=10)
+
+    def put_first(self, key, item):
+        """ Puts on the first cache, waits for the second to hear of it """
+        seen = self.second.stats()["invalidations"]
+        self.first.put(key, item)
+        wait_for(lambda: self.second.stats()["invalidations"] > seen)
+
+    def tearDown(self):
+        """ Stops the caches and the server """
+        self.first.close()
+        self.second.close()
+        self.server.stop()
+
+    def test_put_invalidates_other_l1(self):
+        """ A put on one cache drops the L1 copy of the other """
+        self.put_first("A", "old")
+        self.assertEqual(self.second.get("A"), "old")
+        self.assertEqual(self.second.l1.get("A"), "old")
+        self.first.put("A", "new")
+        self.assertTrue(wait_for(lambda: self.second.l1.get("A") is None))
+        self.assertEqual(self.second.get("A"), "new")
+        self.assertEqual(self.second.stats()["invalidations"], 2)
+
+    def test_invalidation_during_l2_read_skips_fill(self):
+        """ A value read before an invalidation is not kept in the L1 """
+        self.put_first("A", "old")
+        client = self.second.client
+        read = client.get
+
+        def overtaken_get(key):
+            """ Reads the L2, then lets the other worker write """
+            raw = read(key)
+            self.put_first("A", "new")
+            return raw
+
+        client.get = overtaken_get
+        self.assertEqual(self.second.get("A"), "old")
+        client.get = read
+        self.assertIsNone(self.second.l1.get("A"))
+        self.assertEqual(self.second.get("A"), "new")
+
+    def test_sub_millisecond_ttl(self):
+        """ A TTL under 1 ms is sent as PX 1, not rejected """
+        self.first.put("A", "short", ttl=0.0001)
+        self.assertIn(b"cache:A", self.server.expires)
+        time.sleep(0.01)
+        self.assertIsNone(self.second.get("A"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,225 @@
+#!/usr/bin/python3
+""" Two-tier caching: an in-process policy cache in front of Redis """
+import json
+import math
+import pickle
+import threading
+import uuid
+
+LRUCache = __import__('3-lru_cache').LRUCache
+RespError = __import__('resp_client').RespError
+
+
+class TieredCache():
+    """In-process L1 cache of any policy in front of a shared L2 store
+
+    The L2 is a Redis-protocol server reached through a `RespClient`
+    (pooled connections, pipelined commands), so every worker process
+    shares one warm dataset while keeping its hottest items in its own
+    L1. L1 misses are filled from the L2, in one `MGET` round trip for
+    `get_many`.
+
+    Writes go to the L2 first, then to the local L1, and are announced
+    on an invalidation channel: the other workers drop their L1 copy of
+    the written keys, so they read the new value from the L2 next time.
+    An L2 read overtaken by a write of the same key, here or announced
+    by another worker, does not fill the L1 with the value it read.
+
+    Keys must be strings. Values are serialized with `serializer`
+    (`pickle` by default), so the L2 must only be shared by trusted
+    processes.
+    """
+    def __init__(self, client, policy=LRUCache, namespace="cache:",
+                 channel="cache:invalidate", ttl=None, listen=True,
+                 serializer=pickle, **kwargs):
+        """Initializes the TieredCache instance.
+
+        Args:
+            client (RespClient): Client of the L2 server.
+            policy (type): The `BaseCaching` subclass used as L1.
+            namespace (str): Prefix of the L2 keys.
+            channel (str): Pub/sub channel of the invalidations.
+            ttl (float): Default time-to-live, in seconds, of the items
+                in both tiers. Defaults to items that never expire.
+            listen (bool): Whether to drop L1 entries invalidated by
+                other workers, from a background thread.
+            serializer: Module-like object with `dumps` and `loads`.
+            **kwargs: Other options of the L1 (see `BaseCaching`); the L1
+                is always thread-safe.
+        """
+        kwargs['thread_safe'] = True
+        self.client = client
+        self.l1 = policy(ttl=ttl, **kwargs)
+        self.namespace = namespace
+        self.channel = channel
+        self.ttl = ttl
+        self.serializer = serializer
+        self.origin = uuid.uuid4().hex
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.invalidations = 0
+        self._counters = threading.Lock()
+        self._fills = threading.Lock()
+        self._reading = {}
+        self._subscription = None
+        self._listener = None
+        if listen:
+            self._subscription = client.subscribe(channel)
+            self._listener = threading.Thread(target=self._listen,
+                                              name="cache-invalidation",
+                                              daemon=True)
+            self._listener.start()
+
+    def get(self, key):
+        """Returns the item of `key` from the L1, else from the L2, or None
+        """
+        if not key:
+            return None
+        item = self.l1.get(key)
+        if item is not None:
+            return item
+        stamps = self._begin_fill([key])
+        filled = {}
+        try:
+            raw = self.client.get(self.namespace + key)
+            if raw is not None:
+                filled[key] = self.serializer.loads(raw)
+        finally:
+            self._end_fill(stamps, filled)
+        self._count(len(filled), 1 - len(filled))
+        return filled.get(key)
+
+    def get_many(self, keys):
+        """Returns the found items of `keys`, fetching every L1 miss from
+        the L2 in a single `MGET`"""
+        keys = [key for key in keys if key]
+        found = self.l1.get_many(keys)
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        if not missing:
+            return found
+        stamps = self._begin_fill(missing)
+        filled = {}
+        try:
+            raws = self.client.mget([self.namespace + key
+                                     for key in missing])
+            filled = {key: self.serializer.loads(raw)
+                      for key, raw in zip(missing, raws) if raw is not None}
+        finally:
+            self._end_fill(stamps, filled)
+        self._count(len(filled), len(missing) - len(filled))
+        found.update(filled)
+        return found
+
+    def put(self, key, item, ttl=None):
+        """Stores an item in both tiers and invalidates it elsewhere"""
+        if key and item:
+            self.put_many([(key, item)], ttl)
+
+    def put_many(self, items, ttl=None):
+        """Stores several items in both tiers with one pipelined round trip
+        """
+        if hasattr(items, 'items'):
+            items = items.items()
+        batch = {key: item for key, item in items if key and item}
+        if not batch:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        commands = []
+        for key, item in batch.items():
+            command = ["SET", self.namespace + key,
+                       self.serializer.dumps(item)]
+            if ttl is not None:
+                command += ["PX", max(1, math.ceil(ttl * 1000))]
+            commands.append(command)
+        commands.append(self._invalidation(batch))
+        self._check(self.client.pipeline(commands))
+        with self._fills:
+            self._overtake(batch)
+            self.l1.put_many(batch, ttl)
+
+    def delete(self, key):
+        """Removes `key` from both tiers and invalidates it elsewhere"""
+        self._check(self.client.pipeline([
+            ("DEL", self.namespace + key), self._invalidation([key])]))
+        with self._fills:
+            self._overtake([key])
+            self.l1.delete(key)
+
+    def stats(self):
+        """Returns the L1 counters (see `BaseCaching.stats`) along with
+        `l2_hits`, `l2_misses` and `invalidations`"""
+        stats = self.l1.stats()
+        with self._counters:
+            stats.update(l2_hits=self.l2_hits, l2_misses=self.l2_misses,
+                         invalidations=self.invalidations)
+        return stats
+
+    def close(self):
+        """Stops the invalidation listener and closes the connections"""
+        if self._subscription is not None:
+            self._subscription.close()
+            self._listener.join()
+            self._subscription = None
+        self.client.close()
+
+    def _invalidation(self, keys):
+        """Returns the command announcing that `keys` changed"""
+        message = json.dumps({"origin": self.origin, "keys": list(keys)})
+        return ("PUBLISH", self.channel, message)
+
+    def _listen(self):
+        """Drops the L1 entries changed by other workers"""
+        for payload in self._subscription:
+            message = json.loads(payload)
+            if message["origin"] == self.origin:
+                continue
+            with self._fills:
+                self._overtake(message["keys"])
+                for key in message["keys"]:
+                    self.l1.delete(key)
+            with self._counters:
+                self.invalidations += len(message["keys"])
+
+    def _begin_fill(self, keys):
+        """Registers L2 reads of `keys`, returns their write counts"""
+        with self._fills:
+            stamps = {}
+            for key in keys:
+                reading = self._reading.setdefault(key, [0, 0])
+                reading[0] += 1
+                stamps[key] = reading[1]
+            return stamps
+
+    def _end_fill(self, stamps, items):
+        """Ends the L2 reads of `_begin_fill`, storing in the L1 the read
+        `items` that no write overtook"""
+        with self._fills:
+            fresh = {}
+            for key, stamp in stamps.items():
+                reading = self._reading[key]
+                if reading[1] == stamp and key in items:
+                    fresh[key] = items[key]
+                reading[0] -= 1
+                if not reading[0]:
+                    del self._reading[key]
+            self.l1.put_many(fresh)
+
+    def _overtake(self, keys):
+        """Counts a write of `keys` against the L2 reads in progress"""
+        for key in keys:
+            reading = self._reading.get(key)
+            if reading is not None:
+                reading[1] += 1
+
+    def _count(self, hits, misses):
+        """Adds to the L2 counters"""
+        with self._counters:
+            self.l2_hits += hits
+            self.l2_misses += misses
+
+    @staticmethod
+    def _check(replies):
+        """Raises the first error reply of a pipeline"""
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply